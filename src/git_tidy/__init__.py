@@ -1,7 +1,20 @@
 """Git-tidy: A tool for intelligently reordering git commits by grouping them based on file similarity."""
 
-__version__ = "0.1.0"
+from typing import TYPE_CHECKING, Any
+
+if TYPE_CHECKING:
+    # Give type checkers and IDEs the real classes behind the lazy exports
+    from .core import GitError, GitTidy
 
-from .core import GitError, GitTidy
+__version__ = "0.1.0"
 
 __all__ = ["GitTidy", "GitError"]
+
+
+def __getattr__(name: str) -> Any:
+    # Resolve core exports on first access so importing the CLI stays cheap
+    if name in __all__:
+        from . import core
+
+        return getattr(core, name)
+    raise AttributeError(f"module {__name__!r} has no attribute {name!r}")
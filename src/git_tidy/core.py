@@ -3,11 +3,16 @@
 E.g. reorders commits to group those with similar file changes while preserving relative order within each group.
 """
 
+import functools
+import heapq
 import os
+import shlex
 import shutil
 import subprocess
 import sys
 import tempfile
+from collections import Counter
+from collections.abc import Iterable, Iterator
 from typing import Any, Optional, TypedDict
 
 
@@ -17,26 +22,218 @@ class CommitInfo(TypedDict):
     files: set[str]
 
 
+@functools.cache
+def _git_executable() -> str:
+    """Return git's absolute path, so each spawn skips searching PATH."""
+    return shutil.which("git") or "git"
+
+
+def _split_commits(values: Optional[Iterable[str]]) -> list[str]:
+    """Flatten comma-separated commit arguments, dropping empty entries."""
+    return [
+        sha
+        for value in values or ()
+        for sha in (value.split(",") if "," in value else (value,))
+        if sha
+    ]
+
+
+# Commands that never move HEAD or any other ref; anything else run through
+# run_git drops the cached ref lookups
+_READ_ONLY_GIT_COMMANDS = frozenset(
+    {
+        "cat-file",
+        "cherry",
+        "config",
+        "diff",
+        "for-each-ref",
+        "log",
+        "ls-files",
+        "merge-base",
+        "merge-tree",
+        "range-diff",
+        "rev-list",
+        "rev-parse",
+        "show",
+        "status",
+        "var",
+    }
+)
+
+
+# Count of HEAD~N steps available, capped at the 10 commits a default run
+# considers, so the walk never covers the whole history
+_RECENT_COMMIT_COUNT = [
+    "rev-list",
+    "--count",
+    "--first-parent",
+    "--max-count=10",
+    "HEAD",
+]
+
+
+# Temporary `-c` settings for --optimize-merge: rerere, zdiff3 conflict
+# markers and thorough rename detection
+_OPTIMIZE_MERGE_PREFIX = (
+    "-c",
+    "rerere.enabled=true",
+    "-c",
+    "merge.conflictStyle=zdiff3",
+    "-c",
+    "diff.algorithm=patience",
+    "-c",
+    "diff.indentHeuristic=true",
+    "-c",
+    "diff.renames=true",
+    "-c",
+    "merge.renames=true",
+    "-c",
+    "merge.renameLimit=32767",
+)
+
+# Rebases additionally let rerere stage its resolutions and use the merge
+# backend with autostash
+_OPTIMIZE_REBASE_PREFIX = _OPTIMIZE_MERGE_PREFIX + (
+    "-c",
+    "rerere.autoUpdate=true",
+    "-c",
+    "rebase.backend=merge",
+    "-c",
+    "rebase.autoStash=true",
+)
+
+
+# Scratch ref split-commits imports its rewritten history into
+_SPLIT_REF = "refs/git-tidy/split"
+
+
+def _fast_import_path(path: str) -> str:
+    """Quote a path for a fast-import file command where git requires it."""
+    if not path.startswith('"') and "\n" not in path:
+        return path
+    escaped = path.replace("\\", "\\\\").replace('"', '\\"').replace("\n", "\\n")
+    return f'"{escaped}"'
+
+
+def _keeps_refs(cmd: list[str]) -> bool:
+    """Whether a git command leaves HEAD and all other refs untouched."""
+    return cmd[:2] == ["branch", "--show-current"] or (
+        bool(cmd) and cmd[0] in _READ_ONLY_GIT_COMMANDS
+    )
+
+
+def _copy_if_changed(src: str, dst: str) -> str:
+    """Copy src to dst unless dst already has the same size and mtime."""
+    try:
+        src_stat, dst_stat = os.stat(src), os.stat(dst)
+        if (src_stat.st_size, src_stat.st_mtime_ns) == (
+            dst_stat.st_size,
+            dst_stat.st_mtime_ns,
+        ):
+            return dst
+    except OSError:
+        pass
+    return shutil.copy2(src, dst)
+
+
+def _merge_tree(src: str, dst: str) -> int:
+    """Copy the files under src into dst, returning how many could not be copied."""
+    try:
+        shutil.copytree(src, dst, dirs_exist_ok=True, copy_function=_copy_if_changed)
+    except shutil.Error as e:
+        # Files that fail to copy are skipped; the rest of the cache still helps
+        return len(e.args[0])
+    return 0
+
+
+class _GitCatFile:
+    """Long-running `git cat-file --batch` process for reading objects."""
+
+    def __init__(self) -> None:
+        self._process = subprocess.Popen(
+            [_git_executable(), "cat-file", "--batch"],
+            stdin=subprocess.PIPE,
+            stdout=subprocess.PIPE,
+            stderr=subprocess.DEVNULL,
+        )
+
+    def read_object(self, rev: str) -> tuple[str, bytes]:
+        """Return the type and raw contents of the object named by rev."""
+        stdin, stdout = self._process.stdin, self._process.stdout
+        assert stdin is not None and stdout is not None
+        try:
+            stdin.write(rev.encode() + b"\n")
+            stdin.flush()
+            header = stdout.readline().split()
+        except OSError as e:
+            raise GitError(f"Git object reader failed: {e}") from e
+        if len(header) != 3:
+            raise GitError(f"Git object not found: {rev}")
+        obj_type, size = header[1].decode(), int(header[2])
+        data = stdout.read(size)
+        stdout.read(1)  # Trailing newline after each object
+        return obj_type, data
+
+    def read_commit(self, sha: str) -> bytes:
+        """Return the raw commit object for sha."""
+        return self.read_object(f"{sha}^{{commit}}")[1]
+
+    def close(self) -> None:
+        """Stop the worker process."""
+        if self._process.poll() is None:
+            assert self._process.stdin is not None
+            self._process.stdin.close()
+            self._process.wait()
+        if self._process.stdout is not None:
+            self._process.stdout.close()
+
+
 class GitTidy:
     def __init__(self) -> None:
         self.original_branch: Optional[str] = None
         self.original_head: Optional[str] = None
         self.backup_branch: Optional[str] = None
+        # Started on first object read so construction stays side-effect free
+        self._cat_file: Optional[_GitCatFile] = None
+        # HEAD sha, branch name and selected base, valid until a command that
+        # may move a ref
+        self._ref_cache: dict[str, str] = {}
+        # merge-base answers by rev pair, None where the pair has no merge base
+        self._merge_base_cache: dict[tuple[str, str], Optional[str]] = {}
+        # First parent of each commit listed by get_commits_to_rebase
+        self._first_parents: dict[str, str] = {}
+        # Resolved locations inside the git directory; these never move
+        self._git_paths: dict[str, str] = {}
 
     def run_git(
         self,
         cmd: list[str],
         check_output: bool = True,
         env: Optional[dict[str, str]] = None,
+        capture: bool = True,
+        input: Optional[str] = None,
     ) -> subprocess.CompletedProcess[str]:
         """Run git command with error handling."""
+        if not _keeps_refs(cmd):
+            self._ref_cache.clear()
+            self._merge_base_cache.clear()
+        # Commands whose output is never looked at write to /dev/null instead
+        # of pipes that would have to be drained and decoded
+        output: dict[str, Any] = (
+            {"capture_output": True, "text": True}
+            if capture
+            else {"stdout": subprocess.DEVNULL, "stderr": subprocess.DEVNULL}
+        )
+        if input is not None:
+            # Streams fed to git count their data in UTF-8 bytes, whatever
+            # the locale's encoding
+            output.update(input=input, encoding="utf-8")
         try:
             result = subprocess.run(
-                ["git"] + cmd,
-                capture_output=True,
-                text=True,
+                [_git_executable()] + cmd,
                 check=check_output,
                 env=env,
+                **output,
             )
             return result
         except subprocess.CalledProcessError as e:
@@ -44,10 +241,62 @@ class GitTidy:
                 f"Git command failed: {' '.join(cmd)}\nError: {e.stderr}"
             ) from e
 
+    def _current_branch(self) -> str:
+        """Return the checked-out branch name, empty when HEAD is detached."""
+        if "branch" not in self._ref_cache:
+            branch = self.run_git(["branch", "--show-current"]).stdout.strip()
+            self._ref_cache["branch"] = branch
+        return self._ref_cache["branch"]
+
+    def _head_sha(self) -> str:
+        """Return the sha HEAD points at."""
+        if "head" not in self._ref_cache:
+            head = self.run_git(["rev-parse", "HEAD"]).stdout.strip()
+            self._ref_cache["head"] = head
+        return self._ref_cache["head"]
+
+    def _head_and_branch(self) -> tuple[str, str]:
+        """Return HEAD's sha and branch name, resolving both with one git call."""
+        if "head" not in self._ref_cache or "branch" not in self._ref_cache:
+            head, ref = self.run_git(
+                ["rev-parse", "HEAD", "--symbolic-full-name", "HEAD"]
+            ).stdout.split()
+            self._ref_cache["head"] = head
+            # A detached HEAD resolves to "HEAD" rather than a branch ref
+            self._ref_cache["branch"] = (
+                ref[len("refs/heads/") :] if ref.startswith("refs/heads/") else ""
+            )
+        return self._ref_cache["head"], self._ref_cache["branch"]
+
+    def _resolve_git_paths(self, *names: str) -> None:
+        """Look up where names live in the git directory with one rev-parse."""
+        missing = [name for name in names if name not in self._git_paths]
+        if missing:
+            cmd = ["rev-parse"]
+            for name in missing:
+                cmd += ["--git-path", name]
+            paths = self.run_git(cmd).stdout.splitlines()
+            self._git_paths.update(zip(missing, paths))
+
+    def _git_path(self, name: str) -> str:
+        """Return where name lives in the git directory, also inside worktrees."""
+        self._resolve_git_paths(name)
+        return self._git_paths[name]
+
+    def _merge_base(self, a: str, b: str) -> Optional[str]:
+        """Return the merge base of a and b, None if either is missing or unrelated."""
+        key = (a, b)
+        if key not in self._merge_base_cache:
+            try:
+                base = self.run_git(["merge-base", a, b]).stdout.strip() or None
+            except GitError:
+                base = None
+            self._merge_base_cache[key] = base
+        return self._merge_base_cache[key]
+
     def create_backup(self) -> None:
         """Create a backup branch at current HEAD."""
-        self.original_branch = self.run_git(["branch", "--show-current"]).stdout.strip()
-        self.original_head = self.run_git(["rev-parse", "HEAD"]).stdout.strip()
+        self.original_head, self.original_branch = self._head_and_branch()
         self.backup_branch = f"backup-{self.original_head[:8]}"
 
         self.run_git(["branch", self.backup_branch, "HEAD"])
@@ -55,38 +304,41 @@ class GitTidy:
 
     def restore_from_backup(self) -> None:
         """Restore to original state if something goes wrong."""
+        # The operation is over either way; don't leave the object reader behind
+        self.close_object_reader()
         if self.backup_branch and self.original_head:
             print("Restoring from backup due to error...")
 
             # Check if we're in the middle of a rebase and abort it first
             try:
-                status_result = self.run_git(
-                    ["status", "--porcelain=v1"], check_output=False
-                )
-                if status_result.returncode == 0:
-                    # Check if rebase is in progress
-                    rebase_head_path = ".git/REBASE_HEAD"
-                    if os.path.exists(rebase_head_path):
-                        print("Aborting incomplete rebase...")
-                        self.run_git(["rebase", "--abort"], check_output=False)
+                if os.path.exists(self._git_path("REBASE_HEAD")):
+                    print("Aborting incomplete rebase...")
+                    self.run_git(
+                        ["rebase", "--abort"], check_output=False, capture=False
+                    )
             except GitError:
-                # If status check fails, continue with reset anyway
+                # If the check fails, continue with reset anyway
                 pass
 
             self.run_git(["reset", "--hard", self.original_head])
-            self.run_git(["branch", "-D", self.backup_branch], check_output=False)
+            self.run_git(
+                ["branch", "-D", self.backup_branch], check_output=False, capture=False
+            )
 
     def cleanup_backup(self) -> None:
         """Clean up backup branch after successful operation."""
+        self.close_object_reader()
         if self.backup_branch:
-            self.run_git(["branch", "-D", self.backup_branch], check_output=False)
+            self.run_git(
+                ["branch", "-D", self.backup_branch], check_output=False, capture=False
+            )
             print(f"Cleaned up backup branch: {self.backup_branch}")
 
     def _determine_base_commit(self) -> str:
         """Determine the base commit for reordering."""
         # Get current branch name
         try:
-            current_branch = self.run_git(["branch", "--show-current"]).stdout.strip()
+            current_branch = self._current_branch()
         except GitError:
             current_branch = ""
 
@@ -95,7 +347,7 @@ class GitTidy:
             # Use the last 10 commits, but ensure we don't go beyond repository root
             try:
                 # Check how many commits we have
-                commit_count_result = self.run_git(["rev-list", "--count", "HEAD"])
+                commit_count_result = self.run_git(_RECENT_COMMIT_COUNT)
                 commit_count = int(commit_count_result.stdout.strip())
 
                 # Use at most 10 commits or all commits if fewer
@@ -110,20 +362,14 @@ class GitTidy:
         else:
             # Try to find merge base with main/master for feature branches
             for main_branch in ["main", "master", "origin/main", "origin/master"]:
-                try:
-                    base_ref = self.run_git(
-                        ["merge-base", "HEAD", main_branch]
-                    ).stdout.strip()
-                    # Verify this isn't HEAD itself (which means we're on main)
-                    head_sha = self.run_git(["rev-parse", "HEAD"]).stdout.strip()
-                    if base_ref != head_sha:
-                        return base_ref
-                except GitError:
-                    continue
+                base_ref = self._merge_base("HEAD", main_branch)
+                # Verify this isn't HEAD itself (which means we're on main)
+                if base_ref is not None and base_ref != self._head_sha():
+                    return base_ref
 
             # Fallback to recent commits
             try:
-                commit_count_result = self.run_git(["rev-list", "--count", "HEAD"])
+                commit_count_result = self.run_git(_RECENT_COMMIT_COUNT)
                 commit_count = int(commit_count_result.stdout.strip())
                 commits_to_use = min(10, commit_count)
                 if commits_to_use <= 1:
@@ -137,25 +383,79 @@ class GitTidy:
         if base_ref is None:
             base_ref = self._determine_base_commit()
 
-        # Get commit range
+        # Read parents, subjects and touched files in one pass: each record is
+        # "\x01<sha>\0<parents>\0<subject>" optionally followed by "\n" and
+        # NUL-separated paths
         commit_range = f"{base_ref}..HEAD"
         result = self.run_git(
-            ["log", commit_range, "--pretty=format:%H|%s", "--reverse"]  # Oldest first
+            [
+                "log",
+                commit_range,
+                "-z",
+                "--name-only",
+                "--pretty=format:%x01%H%x00%P%x00%s",
+                "--reverse",  # Oldest first
+            ]
         )
 
+        # Paths repeat across commits; interning shares one str per path. Set
+        # and dict lookups in group_commits still hash and compare with ==,
+        # but that check returns at once when both sides are the same object
         commits: list[CommitInfo] = []
-        for line in result.stdout.strip().split("\n"):
-            if line:
-                sha, subject = line.split("|", 1)
-                commit_info: CommitInfo = {
-                    "sha": sha,
-                    "subject": subject,
-                    "files": self.get_commit_files(sha),
-                }
-                commits.append(commit_info)
+        for record in result.stdout.split("\x01")[1:]:
+            header, _, names = record.strip("\0").partition("\n")
+            sha, parents, subject = header.split("\0", 2)
+            self._first_parents[sha] = parents.partition(" ")[0]
+            commit_info: CommitInfo = {
+                "sha": sha,
+                "subject": subject,
+                "files": {sys.intern(name) for name in names.split("\0") if name},
+            }
+            commits.append(commit_info)
 
         return commits
 
+    def _file_changes(
+        self, commit_range: str
+    ) -> dict[str, tuple[str, str, dict[str, str]]]:
+        """Map each commit in range to its author, message and fast-import commands."""
+        # Each record is "\x01<sha>\0<parents>\0<author>\0<message>\x02"
+        # optionally followed by "\n" and NUL-separated raw diff entries and
+        # their paths
+        result = self.run_git(
+            [
+                "log",
+                commit_range,
+                "-z",
+                "--raw",
+                # Root commits list their files whatever log.showRoot says
+                "--root",
+                "--no-renames",
+                "--no-abbrev",
+                "--date=raw",
+                "--pretty=format:%x01%H%x00%P%x00%an <%ae> %ad%x00%B%x02",
+            ]
+        )
+
+        changes: dict[str, tuple[str, str, dict[str, str]]] = {}
+        for record in result.stdout.split("\x01")[1:]:
+            header, _, entries = record.partition("\x02")
+            sha, parents, author, message = header.split("\0", 3)
+            if " " in parents:
+                raise GitError(f"Cannot split merge commit {sha[:8]}")
+            commands: dict[str, str] = {}
+            fields = entries.lstrip("\n").rstrip("\0").split("\0")
+            for entry, path in zip(fields[::2], fields[1::2]):
+                # ":<old mode> <new mode> <old sha> <new sha> <status>"
+                _, mode, _, blob, status = entry.split()
+                commands[path] = (
+                    f"D {_fast_import_path(path)}"
+                    if status == "D"
+                    else f"M {mode} {blob} {_fast_import_path(path)}"
+                )
+            changes[sha] = (author, message.strip(), commands)
+        return changes
+
     def get_commit_files(self, sha: str) -> set[str]:
         """Get set of files changed in a commit."""
         result = self.run_git(["show", "--name-only", "--pretty=format:", sha])
@@ -166,8 +466,29 @@ class GitTidy:
 
     def get_commit_message(self, sha: str) -> str:
         """Get the full commit message for a commit."""
-        result = self.run_git(["show", "--pretty=format:%B", "--no-patch", sha])
-        return result.stdout.strip()
+        raw = self._object_reader().read_commit(sha).decode("utf-8", errors="replace")
+        # The message follows the first blank line after the commit headers
+        return raw.partition("\n\n")[2].strip()
+
+    def _object_reader(self) -> _GitCatFile:
+        """Return the shared `git cat-file` worker, starting it on first use."""
+        if self._cat_file is None:
+            self._cat_file = _GitCatFile()
+        return self._cat_file
+
+    def _commit_exists(self, rev: str) -> bool:
+        """Whether rev resolves to a commit, checked without spawning git."""
+        try:
+            self._object_reader().read_commit(rev)
+        except GitError:
+            return False
+        return True
+
+    def close_object_reader(self) -> None:
+        """Stop the `git cat-file` worker if one was started."""
+        if self._cat_file is not None:
+            self._cat_file.close()
+            self._cat_file = None
 
     def calculate_similarity(self, files1: set[str], files2: set[str]) -> float:
         """Calculate Jaccard similarity between two sets of files."""
@@ -176,9 +497,9 @@ class GitTidy:
         if not files1 or not files2:
             return 0.0
 
-        intersection = len(files1.intersection(files2))
-        union = len(files1.union(files2))
-        return intersection / union if union > 0 else 0.0
+        # The union size is |A| + |B| - |A & B|, so the union set is never built
+        intersection = len(files1 & files2)
+        return intersection / (len(files1) + len(files2) - intersection)
 
     def group_commits(
         self, commits: list[CommitInfo], similarity_threshold: float = 0.3
@@ -187,62 +508,99 @@ class GitTidy:
         if not commits:
             return []
 
+        # Every pair scores at least 0.0, so a non-positive threshold joins all
+        if similarity_threshold <= 0:
+            return [list(commits)]
+
+        # Only commits sharing a file can score above zero, so derive Jaccard
+        # from shared-file counts found through a file -> commits index
+        commits_by_file: dict[str, list[int]] = {}
+        for index, commit in enumerate(commits):
+            for file in commit["files"]:
+                commits_by_file.setdefault(file, []).append(index)
+        sizes = [len(commit["files"]) for commit in commits]
+
         groups = []
         used = set()
 
-        for i, commit in enumerate(commits):
+        for i in range(len(commits)):
             if i in used:
                 continue
 
-            # Start new group with this commit
-            current_group = [commit]
-            used.add(i)
+            # Best similarity of each later commit to any member of this group
+            best: dict[int, float] = {}
+            has_empty = False
+            current_group: list[CommitInfo] = []
 
-            # Find similar commits that come later
-            for j in range(i + 1, len(commits)):
+            # Start new group with commit i and pull in similar later commits
+            for j in range(i, len(commits)):
                 if j in used:
                     continue
-
-                # Check similarity with any commit in current group
-                max_similarity = max(
-                    self.calculate_similarity(commit["files"], commits[j]["files"])
-                    for commit in current_group
+                if j > i:
+                    if sizes[j]:
+                        similarity = best.get(j, 0.0)
+                    else:
+                        # Two empty commits are identical, see calculate_similarity
+                        similarity = 1.0 if has_empty else 0.0
+                    if similarity < similarity_threshold:
+                        continue
+
+                current_group.append(commits[j])
+                used.add(j)
+                has_empty = has_empty or not sizes[j]
+
+                shared = Counter(
+                    k
+                    for file in commits[j]["files"]
+                    for k in commits_by_file[file]
+                    if k > j
                 )
-
-                if max_similarity >= similarity_threshold:
-                    current_group.append(commits[j])
-                    used.add(j)
+                for k, count in shared.items():
+                    similarity = count / (sizes[j] + sizes[k] - count)
+                    if similarity > best.get(k, 0.0):
+                        best[k] = similarity
 
             groups.append(current_group)
 
         return groups
 
-    def create_rebase_todo(self, groups: list[list[CommitInfo]]) -> str:
+    def create_rebase_todo(
+        self,
+        groups: list[list[CommitInfo]],
+        descriptions: Optional[list[str]] = None,
+    ) -> str:
         """Create interactive rebase todo list."""
-        todo_lines = []
+        return "\n".join(self._rebase_todo_lines(groups, descriptions))
 
+    def _rebase_todo_lines(
+        self,
+        groups: list[list[CommitInfo]],
+        descriptions: Optional[list[str]] = None,
+    ) -> Iterator[str]:
+        """Yield the todo lines, describing groups that have no description yet."""
         for group_idx, group in enumerate(groups):
             if group_idx > 0:
-                todo_lines.append(
-                    f"# Group {group_idx + 1}: {self.describe_group(group)}"
+                description = (
+                    descriptions[group_idx]
+                    if descriptions is not None
+                    else self.describe_group(group)
                 )
+                yield f"# Group {group_idx + 1}: {description}"
 
-            for _commit_idx, commit in enumerate(group):
-                action = "pick"
-                todo_lines.append(f"{action} {commit['sha'][:8]} {commit['subject']}")
-
-        return "\n".join(todo_lines)
+            for commit in group:
+                yield f"pick {commit['sha'][:8]} {commit['subject']}"
 
     def describe_group(self, group: list[CommitInfo]) -> str:
         """Create a description for a group of commits."""
-        all_files = set()
+        all_files: set[str] = set()
         for commit in group:
             all_files.update(commit["files"])
 
+        # Only the first three names are shown, so avoid sorting the whole set
+        sample_files = heapq.nsmallest(3, all_files)
         if len(all_files) <= 3:
-            return f"Files: {', '.join(sorted(all_files))}"
+            return f"Files: {', '.join(sample_files)}"
         else:
-            sample_files = sorted(all_files)[:3]
             return f"Files: {', '.join(sample_files)} and {len(all_files) - 3} more"
 
     def perform_rebase(
@@ -253,21 +611,22 @@ class GitTidy:
             print("No grouping needed - commits are already optimally ordered")
             return True
 
-        # Create todo file
-        todo_content = self.create_rebase_todo(groups)
-
         # Get base commit
         first_commit_sha = groups[0][0]["sha"]
-        base_commit = self.run_git(["rev-parse", f"{first_commit_sha}^"]).stdout.strip()
+        # Commits listed by get_commits_to_rebase come with their parents
+        base_commit = (
+            self._first_parents.get(first_commit_sha)
+            or self.run_git(["rev-parse", f"{first_commit_sha}^"]).stdout.strip()
+        )
 
         print(
             f"Rebasing {sum(len(g) for g in groups)} commits into {len(groups)} groups..."
         )
+        # Described once for both the proposal and the todo headers
+        descriptions = [self.describe_group(group) for group in groups]
         print("\nProposed grouping:")
-        for i, group in enumerate(groups):
-            print(
-                f"  Group {i + 1}: {len(group)} commits - {self.describe_group(group)}"
-            )
+        for i, (group, description) in enumerate(zip(groups, descriptions)):
+            print(f"  Group {i + 1}: {len(group)} commits - {description}")
 
         # Confirm with user
         if not no_prompt:
@@ -278,13 +637,16 @@ class GitTidy:
 
         # Write todo to temporary file and start interactive rebase
         with tempfile.NamedTemporaryFile(mode="w", suffix=".txt", delete=False) as f:
-            f.write(todo_content)
+            f.writelines(
+                f"{line}\n" for line in self._rebase_todo_lines(groups, descriptions)
+            )
             todo_file = f.name
 
         try:
             # Set up environment for non-interactive rebase
             env = os.environ.copy()
-            env["GIT_SEQUENCE_EDITOR"] = f"cp {todo_file}"
+            # git runs the editor through the shell, so quote the path
+            env["GIT_SEQUENCE_EDITOR"] = f"cp {shlex.quote(todo_file)}"
 
             result = self.run_git(
                 ["rebase", "-i", base_commit], check_output=False, env=env
@@ -318,13 +680,15 @@ class GitTidy:
         print(
             f"Splitting {len(commits)} commits into {total_files} file-based commits..."
         )
+        # Sorted once here and reused for both the preview and the split
+        sorted_files = [sorted(commit["files"]) for commit in commits]
         print("\nProposed splitting:")
-        for commit in commits:
-            if len(commit["files"]) > 1:
+        for commit, files in zip(commits, sorted_files):
+            if len(files) > 1:
                 print(
-                    f"  Commit {commit['sha'][:8]}: {len(commit['files'])} files -> {len(commit['files'])} commits"
+                    f"  Commit {commit['sha'][:8]}: {len(files)} files -> {len(files)} commits"
                 )
-                for file in sorted(commit["files"]):
+                for file in files:
                     print(f"    - split off {file}")
             else:
                 print(
@@ -338,42 +702,52 @@ class GitTidy:
                 print("Split rebase cancelled")
                 return False
 
-        # Reset to base commit
-        print(f"Resetting to base commit {base_commit[:8]}...")
-        self.run_git(["reset", "--soft", base_commit])
-
-        # Create new commits for each file
+        # Rebuild the branch in a single fast-import stream. Every piece reuses
+        # the blobs its original commit recorded, so the last tree matches the
+        # old tip and nothing in the working tree has to change
+        changes = self._file_changes(f"{base_commit}..{commits[-1]['sha']}")
+        committer = self.run_git(["var", "GIT_COMMITTER_IDENT"]).stdout.strip()
+        stream = [f"reset {_SPLIT_REF}\nfrom {base_commit}\n\n"]
         new_commits = []
-        for commit in commits:
-            files = sorted(commit["files"])
-            original_message = self.get_commit_message(commit["sha"])
+        for commit, files in zip(commits, sorted_files):
+            author, original_message, commands = changes[commit["sha"]]
 
             if len(files) <= 1:
                 # Single file or no files - create commit as-is
-                if files:
-                    # Cherry-pick the commit to get the changes
-                    self.run_git(["cherry-pick", "--no-commit", commit["sha"]])
-                    # Reset and add only the specific file
-                    self.run_git(["reset", "HEAD"])
-                    self.run_git(["add", files[0]])
-                    self.run_git(["commit", "-m", original_message])
-                    new_commits.append(original_message)
-                else:
-                    # Empty commit - just commit with message
-                    self.run_git(["commit", "--allow-empty", "-m", original_message])
-                    new_commits.append(original_message)
+                pieces = [(original_message, list(commands.values()))]
             else:
-                # Multiple files - create separate commits for each file
-                for file in files:
-                    # Cherry-pick the commit to get the changes
-                    self.run_git(["cherry-pick", "--no-commit", commit["sha"]])
-                    # Reset and add only the specific file
-                    self.run_git(["reset", "HEAD"])
-                    self.run_git(["add", file])
-                    # Create commit with split message
-                    split_message = f"split off {file}\n\n{original_message}"
-                    self.run_git(["commit", "-m", split_message])
-                    new_commits.append(split_message)
+                pieces = [
+                    (
+                        f"split off {file}\n\n{original_message}",
+                        [commands.pop(file)] if file in commands else [],
+                    )
+                    for file in files
+                ]
+                # Paths listed apart from the named files, like the old side
+                # of a rename, go with the last piece
+                pieces[-1][1].extend(commands.values())
+
+            for message, file_commands in pieces:
+                data = f"{message}\n"
+                stream.append(
+                    f"commit {_SPLIT_REF}\n"
+                    f"author {author}\n"
+                    f"committer {committer}\n"
+                    f"data {len(data.encode())}\n{data}"
+                )
+                stream.extend(f"{command}\n" for command in file_commands)
+                stream.append("\n")
+                new_commits.append(message)
+
+        try:
+            self.run_git(["fast-import", "--quiet", "--force"], input="".join(stream))
+            # --keep moves the branch but refuses to drop local edits
+            self.run_git(["reset", "--keep", _SPLIT_REF])
+        finally:
+            # The scratch ref must not outlive the split, whether it worked or not
+            self.run_git(
+                ["update-ref", "-d", _SPLIT_REF], check_output=False, capture=False
+            )
 
         print(f"Successfully created {len(new_commits)} commits:")
         for i, message in enumerate(new_commits, 1):
@@ -411,6 +785,8 @@ class GitTidy:
             print(f"Error: {e}")
             self.restore_from_backup()
             sys.exit(1)
+        finally:
+            self.close_object_reader()
 
     def configure_repo(self, options: dict[str, Any]) -> None:
         """Configure repository/global git settings to reduce merge pain.
@@ -459,21 +835,28 @@ class GitTidy:
                 print(f"  git config {scope_flag} {key} {value}")
             return
 
+        # One listing up front lets an already configured repository get away
+        # with a single git call instead of one write per setting
+        listing = self.run_git(["config", scope_flag, "--list"], check_output=False)
+        current: dict[str, str] = {}
+        if listing.returncode == 0:
+            for line in listing.stdout.splitlines():
+                key, _, value = line.partition("=")
+                current[key.lower()] = value
+
         for key, value in settings:
-            self.run_git(["config", scope_flag, key, value])
+            if current.get(key.lower()) != value:
+                self.run_git(["config", scope_flag, key, value])
 
     def rebase_skip_merged(self, options: dict[str, Any]) -> None:
         """Rebase a branch onto base while skipping commits already on base by content.
 
-        Uses `git cherry -v <base> <branch>` to determine which commits are unique (+ lines)
+        Uses `git cherry <base> <branch>` to determine which commits are unique (+ lines)
         and replays only those commits in order onto the base. Safe and explicit alternative
         to a regular rebase when ancestor SHAs changed but content landed unchanged.
         """
         base_ref = options.get("base") or "origin/main"
-        branch = (
-            options.get("branch")
-            or self.run_git(["branch", "--show-current"]).stdout.strip()
-        )
+        branch = options.get("branch") or self._current_branch()
         dry_run = bool(options.get("dry_run", False))
         prompt = bool(options.get("prompt", True))
         backup = bool(options.get("backup", True))
@@ -501,47 +884,20 @@ class GitTidy:
             print("Warning: --by-groups not yet supported; proceeding without grouping")
 
         # Build temporary config prefix if requested
-        git_prefix: list[str] = []
-        if optimize_merge:
-            git_prefix = [
-                "-c",
-                "rerere.enabled=true",
-                "-c",
-                "rerere.autoUpdate=true",
-                "-c",
-                "merge.conflictStyle=zdiff3",
-                "-c",
-                "diff.algorithm=patience",
-                "-c",
-                "diff.indentHeuristic=true",
-                "-c",
-                "diff.renames=true",
-                "-c",
-                "merge.renames=true",
-                "-c",
-                "merge.renameLimit=32767",
-                "-c",
-                "rebase.backend=merge",
-                "-c",
-                "rebase.autoStash=true",
-            ]
+        git_prefix = list(_OPTIMIZE_REBASE_PREFIX) if optimize_merge else []
 
         # Ensure refs are up to date (best-effort)
         self.run_git(git_prefix + ["fetch", "--all", "--prune"], check_output=False)
 
         # Compute branch unique commits vs base via git cherry
-        cherry = self.run_git(git_prefix + ["cherry", "-v", base_ref, branch])
-        unique_lines = [
-            line for line in cherry.stdout.strip().split("\n") if line.startswith("+")
+        cherry = self.run_git(git_prefix + ["cherry", base_ref, branch])
+        # format: "+ <sha>" for unique commits, "- <sha>" for ones already on base
+        unique_commits = [
+            parts[1]
+            for parts in (line.split(" ", 2) for line in cherry.stdout.splitlines())
+            if parts[0] == "+" and len(parts) >= 2
         ]
 
-        unique_commits = []
-        for line in unique_lines:
-            # format: "+ <sha> <subject>"
-            parts = line.split(" ", 2)
-            if len(parts) >= 2:
-                unique_commits.append(parts[1])
-
         print(
             f"Found {len(unique_commits)} commits unique to {branch} relative to {base_ref}"
         )
@@ -583,23 +939,11 @@ class GitTidy:
         if use_rerere_cache and rerere_cache:
             try:
                 if os.path.isdir(rerere_cache):
-                    os.makedirs(rr_cache_dir, exist_ok=True)
-                    for root, _dirs, files in os.walk(rerere_cache):
-                        rel = os.path.relpath(root, rerere_cache)
-                        target_root = (
-                            os.path.join(rr_cache_dir, rel)
-                            if rel != "."
-                            else rr_cache_dir
-                        )
-                        os.makedirs(target_root, exist_ok=True)
-                        for fname in files:
-                            src = os.path.join(root, fname)
-                            dst = os.path.join(target_root, fname)
-                            try:
-                                shutil.copy2(src, dst)
-                            except Exception:
-                                pass
+                    skipped = _merge_tree(rerere_cache, rr_cache_dir)
                     imported_rerere = True
+                    print("Imported rerere cache")
+                    if skipped:
+                        print(f"Skipped {skipped} files that could not be copied")
             except Exception:
                 print("Warning: failed to import rerere cache; continuing")
 
@@ -618,33 +962,55 @@ class GitTidy:
         if auto_resolve_trivial:
             merge_opts += ["-X", "ignore-space-change"]
 
-        def replay_range(commits: list[str]) -> bool:
+        def stop_on_conflict(sha: str, stderr: str) -> bool:
             nonlocal conflicts_count
+            conflicts_count += 1
+            print(f"Cherry-pick failed for {sha[:8]}: {stderr}")
+            if max_conflicts is not None and conflicts_count >= max_conflicts:
+                print("Max conflicts reached; aborting")
+                return False
+            # Abort this pick and stop
+            self.run_git(["cherry-pick", "--abort"], check_output=False, capture=False)
+            return False
+
+        def replay_range(commits: list[str]) -> bool:
+            if not auto_resolve_trivial:
+                # Any conflict ends the replay, so one cherry-pick process can
+                # apply the whole range instead of one process per commit
+                result = self.run_git(
+                    git_prefix + ["cherry-pick", *merge_opts, *commits],
+                    check_output=False,
+                )
+                if result.returncode == 0:
+                    return True
+                failed = commits[0]
+                if len(commits) > 1:
+                    failed = (
+                        self.run_git(
+                            ["rev-parse", "--verify", "-q", "CHERRY_PICK_HEAD"],
+                            check_output=False,
+                        ).stdout.strip()
+                        or failed
+                    )
+                return stop_on_conflict(failed, result.stderr)
+
             for sha in commits:
                 result = self.run_git(
                     git_prefix + ["cherry-pick", *merge_opts, sha], check_output=False
                 )
                 if result.returncode != 0:
-                    # Try trivial auto-continue if requested
-                    if auto_resolve_trivial:
-                        diff = self.run_git(
-                            ["diff", "--name-only", "--diff-filter=U"],
-                            check_output=False,
+                    # Try trivial auto-continue
+                    diff = self.run_git(
+                        ["diff", "--name-only", "--diff-filter=U"],
+                        check_output=False,
+                    )
+                    if diff.returncode == 0 and not diff.stdout.strip():
+                        cont = self.run_git(
+                            ["cherry-pick", "--continue"], check_output=False
                         )
-                        if diff.returncode == 0 and not diff.stdout.strip():
-                            cont = self.run_git(
-                                ["cherry-pick", "--continue"], check_output=False
-                            )
-                            if cont.returncode == 0:
-                                continue
-                    conflicts_count += 1
-                    print(f"Cherry-pick failed for {sha[:8]}: {result.stderr}")
-                    if max_conflicts is not None and conflicts_count >= max_conflicts:
-                        print("Max conflicts reached; aborting")
-                        return False
-                    # Abort this pick and stop
-                    self.run_git(["cherry-pick", "--abort"], check_output=False)
-                    return False
+                        if cont.returncode == 0:
+                            continue
+                    return stop_on_conflict(sha, result.stderr)
             return True
 
         if chunk_size and chunk_size > 0:
@@ -653,42 +1019,42 @@ class GitTidy:
                 ok = replay_range(chunk)
                 if not ok:
                     # Restore original branch
-                    self.run_git(["switch", branch], check_output=False)
-                    self.run_git(["branch", "-D", temp_branch], check_output=False)
+                    self.run_git(["switch", branch], check_output=False, capture=False)
+                    self.run_git(
+                        ["branch", "-D", temp_branch], check_output=False, capture=False
+                    )
                     if backup_branch:
                         print(f"You can recover previous state from {backup_branch}")
                     return
         else:
             ok = replay_range(unique_commits)
             if not ok:
-                self.run_git(["switch", branch], check_output=False)
-                self.run_git(["branch", "-D", temp_branch], check_output=False)
+                self.run_git(["switch", branch], check_output=False, capture=False)
+                self.run_git(
+                    ["branch", "-D", temp_branch], check_output=False, capture=False
+                )
                 if backup_branch:
                     print(f"You can recover previous state from {backup_branch}")
                 return
 
-        # Fast-forward branch to the temp branch state
-        self.run_git(git_prefix + ["branch", "-f", branch, temp_branch])
-        self.run_git(git_prefix + ["switch", branch])
-        self.run_git(git_prefix + ["branch", "-D", temp_branch], check_output=False)
+        # Point branch at the temp branch state and check it out in one step
+        self.run_git(git_prefix + ["switch", "-C", branch])
+        self.run_git(
+            git_prefix + ["branch", "-D", temp_branch],
+            check_output=False,
+            capture=False,
+        )
 
         # Optionally export rerere cache
         if use_rerere_cache and rerere_cache and imported_rerere:
             try:
-                os.makedirs(rerere_cache, exist_ok=True)
-                for root, _dirs, files in os.walk(rr_cache_dir):
-                    rel = os.path.relpath(root, rr_cache_dir)
-                    target_root = (
-                        os.path.join(rerere_cache, rel) if rel != "." else rerere_cache
-                    )
-                    os.makedirs(target_root, exist_ok=True)
-                    for fname in files:
-                        src = os.path.join(root, fname)
-                        dst = os.path.join(target_root, fname)
-                        try:
-                            shutil.copy2(src, dst)
-                        except Exception:
-                            pass
+                if os.path.isdir(rr_cache_dir):
+                    skipped = _merge_tree(rr_cache_dir, rerere_cache)
+                    print("Exported rerere cache")
+                    if skipped:
+                        print(f"Skipped {skipped} files that could not be copied")
+                else:
+                    os.makedirs(rerere_cache, exist_ok=True)
             except Exception:
                 print("Warning: failed to export rerere cache")
         print("Rebase-skip-merged completed successfully.")
@@ -696,10 +1062,7 @@ class GitTidy:
     # Helper commands for smart orchestration
     def preflight_check(self, options: dict[str, Any]) -> None:
         base = options.get("base") or "origin/main"
-        branch = (
-            options.get("branch")
-            or self.run_git(["branch", "--show-current"]).stdout.strip()
-        )
+        branch = options.get("branch") or self._current_branch()
         allow_dirty = bool(options.get("allow_dirty", False))
         allow_wip = bool(options.get("allow_wip", False))
         dry_run = bool(options.get("dry_run", False))
@@ -735,51 +1098,94 @@ class GitTidy:
             "master",
         ]
         fallback: str = options.get("fallback") or "HEAD~10"
+        # The answer only depends on the refs, so reuse it until a command
+        # moves them
+        key = "base:" + "\0".join([*preferred, fallback])
+        if key not in self._ref_cache:
+            self._ref_cache[key] = self._select_base(preferred, fallback)
+        return self._ref_cache[key]
+
+    def _select_base(self, preferred: list[str], fallback: str) -> str:
+        """Return the first preferred base sharing history with HEAD."""
         for cand in preferred:
-            try:
-                mb = self.run_git(["merge-base", "HEAD", cand]).stdout.strip()
-                if mb:
-                    return cand
-            except GitError:
+            # Rule out missing candidates through the object reader so that
+            # merge-base only runs for names that resolve to a commit
+            if not self._commit_exists(cand):
                 continue
+            if self._merge_base("HEAD", cand) is not None:
+                return cand
         return fallback
 
+    def _operation_in_progress(self) -> Optional[str]:
+        """Return the command whose stopped operation can be continued, if any."""
+        # Read the state files git leaves behind instead of probing with
+        # `--continue` calls that are bound to fail
+        try:
+            self._resolve_git_paths(
+                "CHERRY_PICK_HEAD",
+                "REVERT_HEAD",
+                "sequencer",
+                "rebase-merge",
+                "rebase-apply",
+            )
+        except GitError:
+            # Not inside a repository, so nothing can be in progress
+            return None
+        if os.path.exists(self._git_path("CHERRY_PICK_HEAD")):
+            return "cherry-pick"
+        if os.path.exists(self._git_path("REVERT_HEAD")):
+            return "revert"
+        sequencer = self._git_path("sequencer")
+        if os.path.isdir(sequencer):
+            # Multi-commit reverts share the sequencer with cherry-picks; the
+            # remaining todo says which one it is
+            try:
+                with open(os.path.join(sequencer, "todo")) as todo:
+                    first = todo.read(len("revert"))
+            except OSError:
+                first = ""
+            return "revert" if first == "revert" else "cherry-pick"
+        if os.path.isdir(self._git_path("rebase-merge")) or os.path.isdir(
+            self._git_path("rebase-apply")
+        ):
+            return "rebase"
+        return None
+
     def auto_continue(self) -> None:
         # Attempt to continue an in-progress rebase/cherry-pick
-        # First try cherry-pick
-        res = self.run_git(["cherry-pick", "--continue"], check_output=False)
-        if res.returncode == 0:
-            print("Continued cherry-pick")
-            return
-        # Then try rebase
-        res = self.run_git(["rebase", "--continue"], check_output=False)
-        if res.returncode == 0:
-            print("Continued rebase")
-            return
+        operation = self._operation_in_progress()
+        if operation is not None:
+            res = self.run_git([operation, "--continue"], check_output=False)
+            if res.returncode == 0:
+                print(f"Continued {operation}")
+                return
         print("Nothing to continue")
 
     def auto_resolve_trivial(self) -> None:
         # Attempt to resolve trivial conflicts by ignoring whitespace and continuing
+        operation = self._operation_in_progress()
+        if operation is None:
+            print("Trivial auto-resolution not applicable")
+            return
         diff = self.run_git(
             ["diff", "--name-only", "--diff-filter=U"], check_output=False
         )
         if diff.returncode != 0:
             print("No conflict information available")
             return
-        # Try a continue; if it fails, abort the attempt
-        cont = self.run_git(["cherry-pick", "--continue"], check_output=False)
-        if cont.returncode == 0:
-            print("Continued after trivial resolution (cherry-pick)")
+        # Paths still unmerged (e.g. not replayed by rerere) would fail the continue
+        if diff.stdout.strip():
+            print("Trivial auto-resolution not applicable")
             return
-        cont = self.run_git(["rebase", "--continue"], check_output=False)
+        cont = self.run_git([operation, "--continue"], check_output=False)
         if cont.returncode == 0:
-            print("Continued after trivial resolution (rebase)")
+            print(f"Continued after trivial resolution ({operation})")
             return
         print("Trivial auto-resolution not applicable")
 
     def chunked_replay(self, options: dict[str, Any]) -> None:
         base = options.get("base")
-        commits: list[str] = options.get("commits") or []
+        commits = _split_commits(options.get("commits"))
         chunk_size: int = int(options.get("chunk_size") or 0)
         if not base or not commits or chunk_size <= 0:
             print("Missing required arguments for chunked-replay")
@@ -793,16 +1199,29 @@ class GitTidy:
             result = self.run_git(["cherry-pick", *chunk], check_output=False)
             if result.returncode != 0:
                 print("Chunk failed; aborting and leaving temp branch for inspection")
-                self.run_git(["cherry-pick", "--abort"], check_output=False)
+                self.run_git(
+                    ["cherry-pick", "--abort"], check_output=False, capture=False
+                )
                 return
         print("Chunked replay completed")
 
     def range_diff_report(self, old: str, new: str) -> None:
-        res = self.run_git(["range-diff", old, new], check_output=False)
-        if res.returncode == 0:
-            print(res.stdout)
-        else:
-            print(res.stderr)
+        # Stream the report so long range-diffs start printing right away;
+        # errors share the pipe so they show up in place of the report
+        try:
+            process = subprocess.Popen(
+                [_git_executable(), "range-diff", old, new],
+                stdout=subprocess.PIPE,
+                stderr=subprocess.STDOUT,
+                text=True,
+            )
+        except OSError as e:
+            raise GitError(f"Git command failed: range-diff\nError: {e}") from e
+        assert process.stdout is not None
+        with process.stdout:
+            for line in process.stdout:
+                print(line, end="")
+        process.wait()
 
     def validate(self, options: dict[str, Any]) -> None:
         do_lint = bool(options.get("lint", False))
@@ -830,45 +1249,23 @@ class GitTidy:
             if not os.path.isdir(path):
                 print("Invalid rerere cache path")
                 return
-            os.makedirs(rr_cache_dir, exist_ok=True)
-            for root, _dirs, files in os.walk(path):
-                rel = os.path.relpath(root, path)
-                target_root = (
-                    os.path.join(rr_cache_dir, rel) if rel != "." else rr_cache_dir
-                )
-                os.makedirs(target_root, exist_ok=True)
-                for fname in files:
-                    src = os.path.join(root, fname)
-                    dst = os.path.join(target_root, fname)
-                    try:
-                        shutil.copy2(src, dst)
-                    except Exception:
-                        pass
+            skipped = _merge_tree(path, rr_cache_dir)
             print("Imported rerere cache")
+            if skipped:
+                print(f"Skipped {skipped} files that could not be copied")
         elif action == "export":
             os.makedirs(path, exist_ok=True)
             if not os.path.isdir(rr_cache_dir):
                 print("No local rerere cache to export")
                 return
-            for root, _dirs, files in os.walk(rr_cache_dir):
-                rel = os.path.relpath(root, rr_cache_dir)
-                target_root = os.path.join(path, rel) if rel != "." else path
-                os.makedirs(target_root, exist_ok=True)
-                for fname in files:
-                    src = os.path.join(root, fname)
-                    dst = os.path.join(target_root, fname)
-                    try:
-                        shutil.copy2(src, dst)
-                    except Exception:
-                        pass
+            skipped = _merge_tree(rr_cache_dir, path)
             print("Exported rerere cache")
+            if skipped:
+                print(f"Skipped {skipped} files that could not be copied")
 
     def smart_rebase(self, options: dict[str, Any]) -> None:
         """Orchestrated rebase flow combining preflight, dedup-aware replay, and validation."""
-        branch = (
-            options.get("branch")
-            or self.run_git(["branch", "--show-current"]).stdout.strip()
-        )
+        branch = options.get("branch") or self._current_branch()
         base = options.get("base") or self.select_base({})
         dry_run = bool(options.get("dry_run", False))
         prompt = bool(options.get("prompt", True))
@@ -904,6 +1301,9 @@ class GitTidy:
         if backup:
             self.create_backup()
 
+        # Tip before the replay, so the summary can compare old and new series
+        old_tip = self.run_git(["rev-parse", branch]).stdout.strip() if summary else ""
+
         # Rebase
         try:
             if skip_merged:
@@ -938,9 +1338,11 @@ class GitTidy:
 
             if summary:
                 # Print a brief range-diff summary for visibility
-                base_range = f"{base}...{branch}"
-                head_range = f"{base}...{branch}"
-                self.range_diff_report(base_range, head_range)
+                new_tip = self.run_git(["rev-parse", branch]).stdout.strip()
+                if new_tip == old_tip:
+                    print("Branch unchanged; nothing to compare")
+                else:
+                    self.range_diff_report(f"{base}..{old_tip}", f"{base}..{new_tip}")
 
             if backup:
                 self.cleanup_backup()
@@ -953,14 +1355,14 @@ class GitTidy:
     def smart_merge(self, options: dict[str, Any]) -> None:
         """Preview or perform a merge with ort + rename detection and safety.
 
-        Preview uses `git merge --no-commit --no-ff` and aborts to avoid state changes.
+        Preview checks out the target and uses `git merge-tree`, which merges in
+        memory without touching the index or worktree; previews with a conflict
+        bias or rename threshold fall back to `git merge --no-commit --no-ff` and
+        abort to avoid state changes.
         Apply performs the merge and commits if clean, or stops on conflicts.
         """
         source = options.get("branch")
-        target = (
-            options.get("into")
-            or self.run_git(["branch", "--show-current"]).stdout.strip()
-        )
+        target = options.get("into") or self._current_branch()
         if not source:
             print("Missing --branch for smart-merge")
             return
@@ -979,28 +1381,43 @@ class GitTidy:
         do_build = bool(options.get("build", False))
 
         # Build -c prefix for temporary safer settings
-        git_prefix: list[str] = []
-        if optimize_merge:
-            git_prefix = [
-                "-c",
-                "rerere.enabled=true",
-                "-c",
-                "merge.conflictStyle=zdiff3",
-                "-c",
-                "diff.algorithm=patience",
-                "-c",
-                "diff.indentHeuristic=true",
-                "-c",
-                "diff.renames=true",
-                "-c",
-                "merge.renames=true",
-                "-c",
-                "merge.renameLimit=32767",
-            ]
+        git_prefix = list(_OPTIMIZE_MERGE_PREFIX) if optimize_merge else []
 
         # Ensure target checked out
         self.run_git(["switch", target])
 
+        if not apply:
+            print(f"Previewing merge of {source} into {target}...")
+
+        if (
+            not apply
+            and conflict_bias not in {"ours", "theirs"}
+            and not isinstance(rename_threshold, int)
+        ):
+            # merge-tree has no -X strategy options before git 2.40, so only
+            # previews that need none of them are merged in memory
+            tree_prefix = git_prefix
+            if not rename_detect:
+                tree_prefix = git_prefix + ["-c", "merge.renames=false"]
+            result = self.run_git(
+                tree_prefix
+                + ["merge-tree", "--write-tree", "--name-only", "--messages"]
+                + [target, source],
+                check_output=False,
+            )
+            if result.returncode == 0:
+                print("Merge would be clean")
+                return
+            if result.returncode == 1:
+                # stdout holds the tree id and conflicted paths, then a blank
+                # line and the messages
+                messages = result.stdout.partition("\n\n")[2].strip()
+                print(f"Merge resulted in conflicts: {messages}")
+                print("Merge preview/operation ended with conflicts surfaced.")
+                return
+            # Any other exit means merge-tree could not run at all, e.g. git
+            # before 2.38 lacks --write-tree; preview with a real merge instead
+
         # Build merge args
         merge_args = ["merge", "--no-ff", source]
         if not apply:
@@ -1014,9 +1431,7 @@ class GitTidy:
         else:
             merge_args[1:1] = ["-X", "no-renames"]
 
-        if not apply:
-            print(f"Previewing merge of {source} into {target}...")
-        else:
+        if apply:
             if prompt:
                 resp = input(f"Proceed to merge {source} into {target}? (y/N): ")
                 if resp.lower() != "y":
@@ -1030,7 +1445,7 @@ class GitTidy:
             if not apply:
                 print("Merge would be clean")
                 # Abort preview merge to restore state
-                self.run_git(["merge", "--abort"], check_output=False)
+                self.run_git(["merge", "--abort"], check_output=False, capture=False)
             else:
                 print("Merge completed cleanly")
                 if do_lint or do_test or do_build:
@@ -1052,7 +1467,7 @@ class GitTidy:
 
         if not apply:
             # Abort preview merge
-            self.run_git(["merge", "--abort"], check_output=False)
+            self.run_git(["merge", "--abort"], check_output=False, capture=False)
         else:
             # Leave repository in conflict state for manual resolution
             if backup and max_conflicts:
@@ -1064,7 +1479,7 @@ class GitTidy:
 
     def smart_revert(self, options: dict[str, Any]) -> None:
         """Preview or perform revert(s) with strategy hints and safety."""
-        commits: list[str] = options.get("commits") or []
+        commits = _split_commits(options.get("commits"))
         range_expr: Optional[str] = options.get("range")
         count: Optional[int] = options.get("count")
 
@@ -1089,24 +1504,7 @@ class GitTidy:
             return
 
         # Temporary safer settings
-        git_prefix: list[str] = []
-        if optimize_merge:
-            git_prefix = [
-                "-c",
-                "rerere.enabled=true",
-                "-c",
-                "merge.conflictStyle=zdiff3",
-                "-c",
-                "diff.algorithm=patience",
-                "-c",
-                "diff.indentHeuristic=true",
-                "-c",
-                "diff.renames=true",
-                "-c",
-                "merge.renames=true",
-                "-c",
-                "merge.renameLimit=32767",
-            ]
+        git_prefix = list(_OPTIMIZE_MERGE_PREFIX) if optimize_merge else []
 
         # Build revert options
         revert_opts: list[str] = ["revert"]
@@ -1130,22 +1528,28 @@ class GitTidy:
         if apply and backup:
             self.create_backup()
 
-        # Preview/apply sequentially
+        # The first conflict stops the run either way, so one revert process
+        # can handle every commit in order
         conflicts = 0
-        for sha in commits:
-            result = self.run_git(git_prefix + revert_opts + [sha], check_output=False)
-            if result.returncode != 0:
-                print(f"Revert failed for {sha[:8]}: {result.stderr}")
-                conflicts += 1
-                if not apply:
-                    # Abort preview revert and stop
-                    self.run_git(["revert", "--abort"], check_output=False)
-                    break
-                if max_conflicts is not None and conflicts >= max_conflicts:
-                    print("Max conflicts reached; stopping further reverts")
-                    break
-                # For apply mode, leave conflict state for manual resolution
-                break
+        result = self.run_git(git_prefix + revert_opts + commits, check_output=False)
+        if result.returncode != 0:
+            failed = commits[0]
+            if len(commits) > 1:
+                failed = (
+                    self.run_git(
+                        ["rev-parse", "--verify", "-q", "REVERT_HEAD"],
+                        check_output=False,
+                    ).stdout.strip()
+                    or failed
+                )
+            print(f"Revert failed for {failed[:8]}: {result.stderr}")
+            conflicts += 1
+            if not apply:
+                # Abort preview revert and stop
+                self.run_git(["revert", "--abort"], check_output=False, capture=False)
+            elif max_conflicts is not None and conflicts >= max_conflicts:
+                print("Max conflicts reached; stopping further reverts")
+            # For apply mode, leave conflict state for manual resolution
 
         if not apply:
             if conflicts == 0:
@@ -1210,6 +1614,14 @@ class GitTidy:
             # Group commits
             groups = self.group_commits(commits, similarity_threshold)
 
+            # Groups that keep every commit in place (e.g. all singletons)
+            # would make the interactive rebase a no-op rewrite
+            grouped_order = [commit["sha"] for group in groups for commit in group]
+            if grouped_order == [commit["sha"] for commit in commits]:
+                print("No grouping needed - commits are already optimally ordered")
+                self.cleanup_backup()
+                return
+
             # Perform rebase
             success = self.perform_rebase(groups, no_prompt=no_prompt)
 
@@ -1,10 +1,15 @@
 """Tests for git-tidy CLI functionality."""
 
+import subprocess
+import sys
 from unittest.mock import Mock, patch
 
 import pytest
 
 from git_tidy.cli import (
+    _COMMANDS,
+    _create_parser_uncached,
+    _tidy,
     cmd_configure_repo,
     cmd_group_commits,
     cmd_rebase_skip_merged,
@@ -18,6 +23,14 @@ from git_tidy.cli import (
 from git_tidy.core import GitTidy
 
 
+@pytest.fixture(autouse=True)
+def fresh_tidy():
+    """Drop the cached GitTidy instance so tests do not share state."""
+    _tidy.cache_clear()
+    yield
+    _tidy.cache_clear()
+
+
 class TestCLI:
     """Test class for CLI functionality."""
 
@@ -40,6 +53,74 @@ class TestCLI:
         assert "configure-repo" in help_output
         assert "rebase-skip-merged" in help_output
 
+    def test_tidy_instance_is_shared(self):
+        """Test that commands reuse a single GitTidy instance."""
+        assert isinstance(_tidy(), GitTidy)
+        assert _tidy() is _tidy()
+
+    def test_create_parser_is_cached(self):
+        """Test that repeated calls share one parser unless a fresh one is asked for."""
+        assert create_parser() is create_parser()
+        assert create_parser("smart-merge") is create_parser("smart-merge")
+        assert create_parser() is not create_parser("smart-merge")
+        assert _create_parser_uncached() is not create_parser()
+
+    def test_create_parser_single_command(self):
+        """Test that naming a subcommand builds only that subparser."""
+        parser = create_parser("smart-merge")
+        subparsers = parser._subparsers._group_actions[0]
+
+        assert list(subparsers.choices) == ["smart-merge"]
+        args = parser.parse_args(["smart-merge", "--branch", "feature"])
+        assert args.branch == "feature"
+        assert args.rename_detect is True
+
+    def test_create_parser_unknown_command_builds_all(self):
+        """Test that an unknown command falls back to the full parser."""
+        parser = create_parser("not-a-command")
+        subparsers = parser._subparsers._group_actions[0]
+
+        assert "group-commits" in subparsers.choices
+        assert "select-reverts" in subparsers.choices
+        with pytest.raises(SystemExit):
+            parser.parse_args(["not-a-command"])
+
+    def test_create_parser_completion_builds_stubs(self, monkeypatch):
+        """Test that shell completion only fills in the command being completed."""
+        monkeypatch.setenv("_ARGCOMPLETE", "1")
+        monkeypatch.setenv("COMP_LINE", "git-tidy smart-merge --b")
+        parser = create_parser()
+        subparsers = parser._subparsers._group_actions[0]
+
+        assert list(subparsers.choices) == list(_COMMANDS)
+        merge_options = subparsers.choices["smart-merge"]._option_string_actions
+        group_options = subparsers.choices["group-commits"]._option_string_actions
+        assert "--branch" in merge_options
+        assert "--threshold" not in group_options
+
+    def test_create_parser_names_only(self):
+        """Test that top-level help registers subcommands without arguments."""
+        parser = create_parser(names_only=True)
+        subparsers = parser._subparsers._group_actions[0]
+
+        assert list(subparsers.choices) == list(_COMMANDS)
+        group_options = subparsers.choices["group-commits"]._option_string_actions
+        assert "--threshold" not in group_options
+        assert "smart-merge" in parser.format_help()
+
+    @pytest.mark.parametrize("argv", [["--help"], ["-h", "group-commits"]])
+    @patch("git_tidy.cli.create_parser", wraps=create_parser)
+    def test_main_top_level_help_names_only(self, mock_create_parser, argv, capsys):
+        """Test that top-level help lists every subcommand from name stubs."""
+        with patch("sys.argv", ["git-tidy", *argv]):
+            with pytest.raises(SystemExit) as exc_info:
+                main()
+
+        assert exc_info.value.code == 0
+        mock_create_parser.assert_called_once_with(names_only=True)
+        out = capsys.readouterr().out
+        assert all(name in out for name in _COMMANDS)
+
     def test_parse_group_commits_default(self):
         """Test parsing group-commits with default arguments."""
         parser = create_parser()
@@ -121,7 +202,7 @@ class TestCLI:
 
     @patch.object(GitTidy, "get_commits_to_rebase")
     @patch.object(GitTidy, "group_commits")
-    def test_cmd_group_commits_dry_run(self, mock_group, mock_get_commits):
+    def test_cmd_group_commits_dry_run(self, mock_group, mock_get_commits, capsys):
         """Test group-commits command in dry-run mode."""
         # Setup mocks
         mock_commits = [
@@ -140,17 +221,17 @@ class TestCLI:
         args.base = None
         args.threshold = 0.3
 
-        with patch("builtins.print") as mock_print:
-            with patch.object(GitTidy, "describe_group") as mock_describe:
-                mock_describe.side_effect = ["Files: file1.py", "Files: file2.py"]
-                cmd_group_commits(args)
+        with patch.object(GitTidy, "describe_group") as mock_describe:
+            mock_describe.side_effect = ["Files: file1.py", "Files: file2.py"]
+            cmd_group_commits(args)
 
+        out = capsys.readouterr().out
         # Verify the right methods were called
         mock_get_commits.assert_called_once_with(None)
         mock_group.assert_called_once_with(mock_commits, 0.3)
 
         # Verify output
-        mock_print.assert_any_call("Found 2 commits, would group into 2 groups:")
+        assert "Found 2 commits, would group into 2 groups:\n" in out
 
     @patch.object(GitTidy, "run")
     def test_cmd_group_commits_execute(self, mock_run):
@@ -166,7 +247,7 @@ class TestCLI:
         mock_run.assert_called_once_with("origin/main", 0.5, no_prompt=False)
 
     @patch.object(GitTidy, "get_commits_to_rebase")
-    def test_cmd_split_commits_dry_run(self, mock_get_commits):
+    def test_cmd_split_commits_dry_run(self, mock_get_commits, capsys):
         """Test split-commits command in dry-run mode."""
         # Setup mocks
         mock_commits = [
@@ -183,19 +264,19 @@ class TestCLI:
         args.dry_run = True
         args.base = None
 
-        with patch("builtins.print") as mock_print:
-            cmd_split_commits(args)
+        cmd_split_commits(args)
 
+        out = capsys.readouterr().out
         # Verify the right methods were called
         mock_get_commits.assert_called_once_with(None)
 
         # Verify output
-        mock_print.assert_any_call("Found 2 commits to split:")
-        mock_print.assert_any_call("\nCommit abc123: Fix bug 1")
-        mock_print.assert_any_call("  Files (2): file1.py, file2.py")
-        mock_print.assert_any_call("  Would create 2 separate commits:")
-        mock_print.assert_any_call("    - split off file1.py")
-        mock_print.assert_any_call("    - split off file2.py")
+        assert "Found 2 commits to split:\n" in out
+        assert "\nCommit abc123: Fix bug 1\n" in out
+        assert "  Files (2): file1.py, file2.py\n" in out
+        assert "  Would create 2 separate commits:\n" in out
+        assert "    - split off file1.py\n" in out
+        assert "    - split off file2.py\n" in out
 
     @patch.object(GitTidy, "split_commits")
     def test_cmd_split_commits_execute(self, mock_split):
@@ -210,7 +291,7 @@ class TestCLI:
         mock_split.assert_called_once_with("origin/main", no_prompt=False)
 
     @patch.object(GitTidy, "get_commits_to_rebase")
-    def test_cmd_split_commits_empty_commits(self, mock_get_commits):
+    def test_cmd_split_commits_empty_commits(self, mock_get_commits, capsys):
         """Test split-commits with no commits found."""
         mock_get_commits.return_value = []
 
@@ -218,10 +299,10 @@ class TestCLI:
         args.dry_run = True
         args.base = "HEAD~5"
 
-        with patch("builtins.print") as mock_print:
-            cmd_split_commits(args)
+        cmd_split_commits(args)
 
-        mock_print.assert_any_call("Found 0 commits to split:")
+        out = capsys.readouterr().out
+        assert "Found 0 commits to split:\n" in out
 
     @patch.object(GitTidy, "get_commits_to_rebase")
     @patch.object(GitTidy, "run_git")
@@ -276,11 +357,12 @@ class TestCLI:
         mock_get_commits.assert_called_once_with(None)
         mock_print.assert_called_once_with("No commits found to squash")
 
+    @patch("sys.argv", ["git-tidy", "--unknown"])
     @patch("git_tidy.cli.create_parser")
     def test_main_no_subcommand(self, mock_create_parser):
         """Test main function when no subcommand is provided."""
         mock_parser = Mock()
-        mock_parser.parse_args.return_value = Mock(spec=[])  # No 'func' attribute
+        mock_parser.parse_args.return_value = Mock(command=None)
         mock_create_parser.return_value = mock_parser
 
         with pytest.raises(SystemExit) as exc_info:
@@ -289,18 +371,21 @@ class TestCLI:
         assert exc_info.value.code == 1
         mock_parser.print_help.assert_called_once()
 
+    @patch("sys.argv", ["git-tidy", "group-commits"])
     @patch("git_tidy.cli.create_parser")
     def test_main_with_subcommand(self, mock_create_parser):
         """Test main function with valid subcommand."""
         mock_func = Mock()
         mock_args = Mock()
-        mock_args.func = mock_func
+        mock_args.command = "group-commits"
 
         mock_parser = Mock()
         mock_parser.parse_args.return_value = mock_args
         mock_create_parser.return_value = mock_parser
 
-        main()
+        command = _COMMANDS["group-commits"]._replace(func=mock_func)
+        with patch.dict(_COMMANDS, {"group-commits": command}):
+            main()
 
         mock_func.assert_called_once_with(mock_args)
 
@@ -338,6 +423,27 @@ class TestCLI:
 
         mock_configure.assert_called_once()
 
+    @patch.object(GitTidy, "configure_repo")
+    def test_cmd_configure_repo_options_from_parsed_args(self, mock_configure):
+        """Test configure-repo forwards exactly its parsed options."""
+        args = create_parser().parse_args(["configure-repo", "--dry-run"])
+
+        cmd_configure_repo(args)
+
+        mock_configure.assert_called_once_with(
+            {
+                "scope": "local",
+                "preset": "safe",
+                "enable": [],
+                "disable": [],
+                "lockfile_policy": None,
+                "dry_run": True,
+                "no_prompt": False,
+                "backup_path": None,
+                "undo": False,
+            }
+        )
+
     def test_parse_rebase_skip_merged_defaults(self):
         """Test parsing rebase-skip-merged with defaults."""
         parser = create_parser()
@@ -442,6 +548,24 @@ class TestCLI:
                 parser.parse_args([cmd, "--help"])
             assert exc_info.value.code == 0
 
+    def test_parse_chunked_replay_repeated_commits(self):
+        """Test every --commits occurrence is kept for chunked-replay."""
+        parser = create_parser()
+        args = parser.parse_args(
+            [
+                "chunked-replay",
+                "--base",
+                "main",
+                "--commits",
+                "a1,b2",
+                "--commits",
+                "c3",
+                "--chunk-size",
+                "2",
+            ]
+        )
+        assert args.commits == ["a1,b2", "c3"]
+
     def test_parse_smart_merge_defaults(self):
         parser = create_parser()
         args = parser.parse_args(["smart-merge", "--branch", "feature/X"])
@@ -512,18 +636,157 @@ class TestCLI:
         cmd_smart_rebase(args)
         mock_smart.assert_called_once()
 
+    @patch("sys.argv", ["git-tidy", "auto-continue"])
+    @patch("git_tidy.cli.create_parser")
+    @patch.object(GitTidy, "auto_continue")
+    def test_main_fast_dispatch_no_arg_command(self, mock_continue, mock_create_parser):
+        """Test that argument-less commands bypass argparse."""
+        main()
+
+        mock_continue.assert_called_once_with()
+        mock_create_parser.assert_not_called()
+
+    @patch("git_tidy.cli.create_parser")
+    @patch.object(GitTidy, "select_base")
+    def test_main_fast_dispatch_select_base(self, mock_select, mock_create_parser):
+        """Test hand-parsed select-base options."""
+        mock_select.return_value = "main"
+        argv = ["git-tidy", "select-base", "--preferred", "a", "b", "--fallback", "c"]
+        with patch("sys.argv", argv):
+            with patch("builtins.print") as mock_print:
+                main()
+
+        mock_select.assert_called_once_with({"preferred": ["a", "b"], "fallback": "c"})
+        mock_print.assert_called_once_with("main")
+        mock_create_parser.assert_not_called()
+
+    @patch("git_tidy.cli.create_parser")
+    @patch.object(GitTidy, "range_diff_report")
+    def test_main_fast_dispatch_range_diff_report(
+        self, mock_report, mock_create_parser
+    ):
+        """Test that range-diff-report positionals bypass argparse."""
+        with patch("sys.argv", ["git-tidy", "range-diff-report", "a..b", "a..c"]):
+            main()
+
+        mock_report.assert_called_once_with("a..b", "a..c")
+        mock_create_parser.assert_not_called()
+
+    @pytest.mark.parametrize(
+        "argv",
+        [
+            ["auto-continue", "--help"],
+            ["select-base", "--fallback=HEAD~3"],
+            ["select-base", "--preferred"],
+            ["range-diff-report", "a..b"],
+        ],
+    )
+    @patch("git_tidy.cli.create_parser")
+    def test_main_fast_dispatch_falls_back(self, mock_create_parser, argv):
+        """Test that unexpected arguments are left to argparse."""
+        with patch("sys.argv", ["git-tidy", *argv]):
+            with pytest.raises(SystemExit):
+                main()
+
+        mock_create_parser.assert_called_once_with(argv[0])
+
+    @patch("sys.argv", ["git-tidy"])
+    def test_main_completion_hands_off_to_argcomplete(self, monkeypatch):
+        """Test that completion requests are answered by argcomplete."""
+        monkeypatch.setenv("_ARGCOMPLETE", "1")
+        monkeypatch.setenv("COMP_LINE", "git-tidy sma")
+        argcomplete = Mock()
+        argcomplete.autocomplete.side_effect = SystemExit(0)
+
+        with patch.dict(sys.modules, {"argcomplete": argcomplete}):
+            with pytest.raises(SystemExit):
+                main()
+
+        parser = argcomplete.autocomplete.call_args[0][0]
+        assert "smart-merge" in parser.format_help()
+
+    @patch("sys.argv", ["git-tidy", "--version"])
+    def test_main_completion_without_argcomplete(self, monkeypatch):
+        """Test that a missing argcomplete leaves normal handling in place."""
+        monkeypatch.setenv("_ARGCOMPLETE", "1")
+
+        with patch.dict(sys.modules, {"argcomplete": None}):
+            with patch("builtins.print") as mock_print:
+                main()
+
+        mock_print.assert_called_once_with("git-tidy 0.1.0")
+
+    @patch("git_tidy.cli._fast_dispatch", return_value=True)
+    def test_main_starts_from_fresh_git_tidy(self, _mock_dispatch):
+        """Test main() drops the shared instance and stops its object reader."""
+        stale = _tidy()
+        stale._ref_cache["head"] = "abc123"
+        with patch.object(stale, "close_object_reader") as mock_close:
+            with patch("sys.argv", ["git-tidy", "auto-continue"]):
+                main()
+
+        mock_close.assert_called_once_with()
+        assert _tidy() is not stale
+
+    def test_version_does_not_load_argparse(self):
+        """Test that --version is answered without importing argparse."""
+        code = (
+            "import sys; sys.argv = ['git-tidy', '--version']; "
+            "from git_tidy.cli import main; main(); print('argparse' in sys.modules)"
+        )
+        result = subprocess.run(
+            [sys.executable, "-c", code], capture_output=True, text=True, check=True
+        )
+
+        assert result.stdout.split() == ["git-tidy", "0.1.0", "False"]
+
+    def test_fast_dispatch_does_not_load_argparse(self, tmp_path):
+        """Test that fast-path subcommands run without importing argparse."""
+        code = (
+            "import sys; sys.argv = ['git-tidy', 'auto-continue']; "
+            "from git_tidy.cli import main; main(); print('argparse' in sys.modules)"
+        )
+        result = subprocess.run(
+            [sys.executable, "-c", code],
+            capture_output=True,
+            text=True,
+            check=True,
+            cwd=tmp_path,
+        )
+
+        assert result.stdout.splitlines() == ["Nothing to continue", "False"]
+
+    def test_import_cli_does_not_load_core(self):
+        """Test that importing the CLI defers loading the core module."""
+        code = "import sys, git_tidy.cli; print('git_tidy.core' in sys.modules)"
+        result = subprocess.run(
+            [sys.executable, "-c", code], capture_output=True, text=True, check=True
+        )
+
+        assert result.stdout.strip() == "False"
+
     @patch("sys.argv", ["git-tidy"])
     @patch("git_tidy.cli.create_parser")
     def test_main_integration_no_args(self, mock_create_parser):
         """Integration test for main with no arguments."""
-        mock_parser = Mock()
-        mock_parser.parse_args.return_value = Mock(spec=[])
-        mock_create_parser.return_value = mock_parser
+        with patch("builtins.print") as mock_print:
+            with pytest.raises(SystemExit) as exc_info:
+                main()
 
-        with pytest.raises(SystemExit):
-            main()
+        assert exc_info.value.code == 1
+        mock_create_parser.assert_not_called()
+        mock_print.assert_any_call("usage: git-tidy [-h] [-V] COMMAND ...")
 
-        mock_parser.print_help.assert_called_once()
+    @pytest.mark.parametrize("flag", ["--version", "-V"])
+    @patch("git_tidy.cli.create_parser")
+    def test_main_version_fast_path(self, mock_create_parser, flag):
+        """Test that --version is answered without building the parser."""
+        with patch("sys.argv", ["git-tidy", flag]):
+            with patch("builtins.print") as mock_print:
+                main()
+
+        mock_create_parser.assert_not_called()
+        mock_print.assert_called_once_with("git-tidy 0.1.0")
 
 
 class TestCLIEdgeCases:
@@ -538,7 +801,7 @@ class TestCLIEdgeCases:
             parser.parse_args(["group-commits", "--threshold", "invalid"])
 
     @patch.object(GitTidy, "get_commits_to_rebase")
-    def test_cmd_group_commits_empty_commits(self, mock_get_commits):
+    def test_cmd_group_commits_empty_commits(self, mock_get_commits, capsys):
         """Test group-commits with no commits found."""
         mock_get_commits.return_value = []
 
@@ -547,14 +810,14 @@ class TestCLIEdgeCases:
         args.base = None
         args.threshold = 0.3
 
-        with patch("builtins.print") as mock_print:
-            cmd_group_commits(args)
+        cmd_group_commits(args)
 
-        mock_print.assert_any_call("Found 0 commits, would group into 0 groups:")
+        out = capsys.readouterr().out
+        assert "Found 0 commits, would group into 0 groups:\n" in out
 
     @patch.object(GitTidy, "get_commits_to_rebase")
     @patch.object(GitTidy, "group_commits")
-    def test_cmd_group_commits_single_group(self, mock_group, mock_get_commits):
+    def test_cmd_group_commits_single_group(self, mock_group, mock_get_commits, capsys):
         """Test group-commits with single group output."""
         mock_commits = [
             {"sha": "abc123", "subject": "Fix bug 1", "files": {"file1.py"}},
@@ -568,17 +831,17 @@ class TestCLIEdgeCases:
         args.base = "HEAD~5"
         args.threshold = 0.1
 
-        with patch("builtins.print") as mock_print:
-            with patch.object(GitTidy, "describe_group") as mock_describe:
-                mock_describe.return_value = "Files: file1.py"
-                cmd_group_commits(args)
+        with patch.object(GitTidy, "describe_group") as mock_describe:
+            mock_describe.return_value = "Files: file1.py"
+            cmd_group_commits(args)
 
+        out = capsys.readouterr().out
         mock_get_commits.assert_called_once_with("HEAD~5")
         mock_group.assert_called_once_with(mock_commits, 0.1)
-        mock_print.assert_any_call("Found 1 commits, would group into 1 groups:")
+        assert "Found 1 commits, would group into 1 groups:\n" in out
 
     @patch.object(GitTidy, "get_commits_to_rebase")
-    def test_cmd_split_commits_single_file_commits(self, mock_get_commits):
+    def test_cmd_split_commits_single_file_commits(self, mock_get_commits, capsys):
         """Test split-commits with commits that already have single files."""
         mock_commits = [
             {"sha": "abc123", "subject": "Fix bug 1", "files": {"file1.py"}},
@@ -590,17 +853,17 @@ class TestCLIEdgeCases:
         args.dry_run = True
         args.base = None
 
-        with patch("builtins.print") as mock_print:
-            cmd_split_commits(args)
+        cmd_split_commits(args)
 
+        out = capsys.readouterr().out
         # Should show that each commit would create 1 separate commit
-        mock_print.assert_any_call("Found 2 commits to split:")
-        mock_print.assert_any_call("  Would create 1 separate commits:")
-        mock_print.assert_any_call("    - split off file1.py")
-        mock_print.assert_any_call("    - split off file2.py")
+        assert "Found 2 commits to split:\n" in out
+        assert "  Would create 1 separate commits:\n" in out
+        assert "    - split off file1.py\n" in out
+        assert "    - split off file2.py\n" in out
 
     @patch.object(GitTidy, "get_commits_to_rebase")
-    def test_cmd_split_commits_mixed_file_counts(self, mock_get_commits):
+    def test_cmd_split_commits_mixed_file_counts(self, mock_get_commits, capsys):
         """Test split-commits with mixed file counts."""
         mock_commits = [
             {"sha": "abc123", "subject": "Single file", "files": {"file1.py"}},
@@ -617,26 +880,26 @@ class TestCLIEdgeCases:
         args.dry_run = True
         args.base = None
 
-        with patch("builtins.print") as mock_print:
-            cmd_split_commits(args)
+        cmd_split_commits(args)
 
+        out = capsys.readouterr().out
         # Should show different handling for each type
-        mock_print.assert_any_call("Found 3 commits to split:")
-        mock_print.assert_any_call("\nCommit abc123: Single file")
-        mock_print.assert_any_call("  Files (1): file1.py")
-        mock_print.assert_any_call("  Would create 1 separate commits:")
-        mock_print.assert_any_call("    - split off file1.py")
-
-        mock_print.assert_any_call("\nCommit def456: Multiple files")
-        mock_print.assert_any_call("  Files (3): file2.py, file3.py, file4.py")
-        mock_print.assert_any_call("  Would create 3 separate commits:")
-        mock_print.assert_any_call("    - split off file2.py")
-        mock_print.assert_any_call("    - split off file3.py")
-        mock_print.assert_any_call("    - split off file4.py")
-
-        mock_print.assert_any_call("\nCommit ghi789: Empty commit")
-        mock_print.assert_any_call("  Files (0): ")
-        mock_print.assert_any_call("  Would create 0 separate commits:")
+        assert "Found 3 commits to split:\n" in out
+        assert "\nCommit abc123: Single file\n" in out
+        assert "  Files (1): file1.py\n" in out
+        assert "  Would create 1 separate commits:\n" in out
+        assert "    - split off file1.py\n" in out
+
+        assert "\nCommit def456: Multiple files\n" in out
+        assert "  Files (3): file2.py, file3.py, file4.py\n" in out
+        assert "  Would create 3 separate commits:\n" in out
+        assert "    - split off file2.py\n" in out
+        assert "    - split off file3.py\n" in out
+        assert "    - split off file4.py\n" in out
+
+        assert "\nCommit ghi789: Empty commit\n" in out
+        assert "  Files (0): \n" in out
+        assert "  Would create 0 separate commits:\n" in out
 
     def test_parse_smart_revert_defaults(self):
         parser = create_parser()
@@ -673,6 +936,7 @@ class TestCLIEdgeCases:
 
         _cmd_smart_revert(args)
         mock_rev.assert_called_once()
+        assert mock_rev.call_args[0][0]["commits"] == ["a1,b2", "c3"]
 
     def test_parse_select_reverts(self):
         parser = create_parser()
@@ -1,11 +1,40 @@
 """Tests for git-tidy core functionality."""
 
+import io
+import os
+import shutil
 import subprocess
 from unittest.mock import Mock, patch
 
 import pytest
 
-from git_tidy.core import GitError, GitTidy
+from git_tidy.core import GitError, GitTidy, _git_executable, _split_commits
+
+# Expected `git log` invocation and output format for get_commits_to_rebase
+LOG_ARGS = ["-z", "--name-only", "--pretty=format:%x01%H%x00%P%x00%s", "--reverse"]
+
+
+def git_repo(path):
+    """Initialise a repository at path, returning a runner for git commands."""
+
+    def git(*args):
+        return subprocess.run(
+            ["git", *args], cwd=path, check=False, capture_output=True, text=True
+        )
+
+    git("init", "-q")
+    git("config", "user.name", "Tester")
+    git("config", "user.email", "tester@example.com")
+    return git
+
+
+def log_output(*commits):
+    """Build `git log -z --name-only` output for (sha, subject, files) tuples."""
+    return "".join(
+        f"\x01{sha}\x00{sha}-parent\x00{subject}"
+        + ("\n" + "\x00".join(files) + "\x00\x00" if files else "\x00")
+        for sha, subject, files in commits
+    )
 
 
 def test_calculate_similarity():
@@ -52,6 +81,7 @@ def test_describe_group():
     group = [{"files": files}]
     description = git_tidy.describe_group(group)
     assert "more" in description
+    assert description == "Files: file0.py, file1.py, file2.py and 7 more"
 
 
 def test_group_commits():
@@ -76,6 +106,30 @@ def test_group_commits():
     assert len(groups[1]) == 1  # Second group has 1 commit
 
 
+def test_group_commits_chains_through_group_members():
+    """Test that later commits join via any member, including empty commits."""
+    git_tidy = GitTidy()
+
+    commits = [
+        {"sha": "a", "subject": "A", "files": {"a.py"}},
+        {"sha": "e1", "subject": "Empty 1", "files": set()},
+        {"sha": "ab", "subject": "AB", "files": {"a.py", "b.py"}},
+        {"sha": "b", "subject": "B", "files": {"b.py"}},
+        {"sha": "e2", "subject": "Empty 2", "files": set()},
+    ]
+
+    groups = git_tidy.group_commits(commits, similarity_threshold=0.5)
+    assert [[c["sha"] for c in group] for group in groups] == [
+        ["a", "ab", "b"],  # "b" only matches "ab", which joined via "a"
+        ["e1", "e2"],
+    ]
+
+    # Nothing scores below zero, so a zero threshold groups everything
+    groups = git_tidy.group_commits(commits, similarity_threshold=0.0)
+    assert len(groups) == 1
+    assert len(groups[0]) == 5
+
+
 class TestGitTidy:
     """Test class for GitTidy functionality."""
 
@@ -101,9 +155,24 @@ class TestGitTidy:
 
         assert result == mock_result
         mock_run.assert_called_once_with(
-            ["git", "status"], capture_output=True, text=True, check=True, env=None
+            [_git_executable(), "status"],
+            capture_output=True,
+            text=True,
+            check=True,
+            env=None,
         )
 
+    def test_git_executable_is_resolved_once(self):
+        """Test git is looked up on PATH once and reused by absolute path."""
+        _git_executable.cache_clear()
+        try:
+            with patch("shutil.which", return_value="/usr/bin/git") as mock_which:
+                assert _git_executable() == "/usr/bin/git"
+                assert _git_executable() == "/usr/bin/git"
+            mock_which.assert_called_once_with("git")
+        finally:
+            _git_executable.cache_clear()
+
     @patch("subprocess.run")
     def test_run_git_failure(self, mock_run):
         """Test git command failure handling."""
@@ -128,15 +197,48 @@ class TestGitTidy:
 
         assert result == mock_result
         mock_run.assert_called_once_with(
-            ["git", "status"], capture_output=True, text=True, check=False, env=None
+            [_git_executable(), "status"],
+            capture_output=True,
+            text=True,
+            check=False,
+            env=None,
+        )
+
+    @patch("subprocess.run")
+    def test_run_git_discards_output(self, mock_run):
+        """Test uncaptured git commands write to /dev/null instead of pipes."""
+        self.git_tidy.run_git(["merge", "--abort"], check_output=False, capture=False)
+
+        mock_run.assert_called_once_with(
+            [_git_executable(), "merge", "--abort"],
+            stdout=subprocess.DEVNULL,
+            stderr=subprocess.DEVNULL,
+            check=False,
+            env=None,
         )
 
+    @patch("subprocess.run")
+    def test_head_and_branch_cached_until_refs_change(self, mock_run):
+        """Test HEAD/branch lookups are reused until a mutating command runs."""
+        mock_run.side_effect = lambda cmd, **kwargs: Mock(stdout=f"{cmd[1]}-out")
+
+        assert self.git_tidy._current_branch() == "branch-out"
+        assert self.git_tidy._head_sha() == "rev-parse-out"
+        self.git_tidy.run_git(["merge-base", "HEAD", "main"])  # read-only
+        self.git_tidy._current_branch()
+        self.git_tidy._head_sha()
+        assert mock_run.call_count == 3
+
+        self.git_tidy.run_git(["reset", "--hard", "abc123"])
+        self.git_tidy._current_branch()
+        self.git_tidy._head_sha()
+        assert mock_run.call_count == 6
+
     @patch.object(GitTidy, "run_git")
     def test_create_backup(self, mock_run_git):
         """Test backup creation."""
         mock_run_git.side_effect = [
-            Mock(stdout="main"),  # branch --show-current
-            Mock(stdout="abcd1234567890"),  # rev-parse HEAD
+            Mock(stdout="abcd1234567890\nrefs/heads/main\n"),  # rev-parse HEAD + ref
             Mock(),  # branch backup-abcd1234 HEAD
         ]
 
@@ -147,6 +249,26 @@ class TestGitTidy:
         assert self.git_tidy.original_head == "abcd1234567890"
         assert self.git_tidy.backup_branch == "backup-abcd1234"
         mock_print.assert_called_once_with("Created backup branch: backup-abcd1234")
+        mock_run_git.assert_any_call(
+            ["rev-parse", "HEAD", "--symbolic-full-name", "HEAD"]
+        )
+        # The branch read for the backup is reused by later lookups
+        assert self.git_tidy._current_branch() == "main"
+        assert mock_run_git.call_count == 2
+
+    @patch.object(GitTidy, "run_git")
+    def test_create_backup_detached_head(self, mock_run_git):
+        """Test backup creation records no branch for a detached HEAD."""
+        mock_run_git.side_effect = [
+            Mock(stdout="abcd1234567890\nHEAD\n"),  # rev-parse HEAD + ref
+            Mock(),  # branch backup-abcd1234 HEAD
+        ]
+
+        with patch("builtins.print"):
+            self.git_tidy.create_backup()
+
+        assert self.git_tidy.original_branch == ""
+        assert self.git_tidy.original_head == "abcd1234567890"
 
     @patch("os.path.exists")
     @patch.object(GitTidy, "run_git")
@@ -155,18 +277,19 @@ class TestGitTidy:
         self.git_tidy.backup_branch = "backup-abcd1234"
         self.git_tidy.original_head = "abcd1234567890"
 
-        # Mock git status to return success but no rebase in progress
-        mock_run_git.return_value.returncode = 0
+        # No rebase in progress
+        mock_run_git.return_value.stdout = ".git/REBASE_HEAD\n"
         mock_exists.return_value = False
 
         with patch("builtins.print"):
             self.git_tidy.restore_from_backup()
 
-        assert mock_run_git.call_count == 3  # status, reset, branch delete
-        mock_run_git.assert_any_call(["status", "--porcelain=v1"], check_output=False)
+        assert mock_run_git.call_count == 3  # rev-parse, reset, branch delete
+        mock_run_git.assert_any_call(["rev-parse", "--git-path", "REBASE_HEAD"])
+        mock_exists.assert_called_once_with(".git/REBASE_HEAD")
         mock_run_git.assert_any_call(["reset", "--hard", "abcd1234567890"])
         mock_run_git.assert_any_call(
-            ["branch", "-D", "backup-abcd1234"], check_output=False
+            ["branch", "-D", "backup-abcd1234"], check_output=False, capture=False
         )
 
     @patch("os.path.exists")
@@ -178,8 +301,8 @@ class TestGitTidy:
         self.git_tidy.backup_branch = "backup-abcd1234"
         self.git_tidy.original_head = "abcd1234567890"
 
-        # Mock git status to return success and rebase in progress
-        mock_run_git.return_value.returncode = 0
+        # Rebase in progress
+        mock_run_git.return_value.stdout = ".git/REBASE_HEAD\n"
         mock_exists.return_value = True
 
         with patch("builtins.print"):
@@ -187,12 +310,14 @@ class TestGitTidy:
 
         assert (
             mock_run_git.call_count == 4
-        )  # status, rebase abort, reset, branch delete
-        mock_run_git.assert_any_call(["status", "--porcelain=v1"], check_output=False)
-        mock_run_git.assert_any_call(["rebase", "--abort"], check_output=False)
+        )  # rev-parse, rebase abort, reset, branch delete
+        mock_run_git.assert_any_call(["rev-parse", "--git-path", "REBASE_HEAD"])
+        mock_run_git.assert_any_call(
+            ["rebase", "--abort"], check_output=False, capture=False
+        )
         mock_run_git.assert_any_call(["reset", "--hard", "abcd1234567890"])
         mock_run_git.assert_any_call(
-            ["branch", "-D", "backup-abcd1234"], check_output=False
+            ["branch", "-D", "backup-abcd1234"], check_output=False, capture=False
         )
 
     @patch.object(GitTidy, "run_git")
@@ -204,10 +329,20 @@ class TestGitTidy:
             self.git_tidy.cleanup_backup()
 
         mock_run_git.assert_called_once_with(
-            ["branch", "-D", "backup-abcd1234"], check_output=False
+            ["branch", "-D", "backup-abcd1234"], check_output=False, capture=False
         )
         mock_print.assert_called_once_with("Cleaned up backup branch: backup-abcd1234")
 
+    def test_cleanup_backup_closes_object_reader(self):
+        """Test finishing an operation stops the cat-file worker."""
+        reader = Mock()
+        self.git_tidy._cat_file = reader
+
+        self.git_tidy.cleanup_backup()
+
+        reader.close.assert_called_once_with()
+        assert self.git_tidy._cat_file is None
+
     def test_cleanup_backup_no_branch(self):
         """Test cleanup when no backup branch exists."""
         with patch.object(self.git_tidy, "run_git") as mock_run_git:
@@ -236,19 +371,19 @@ class TestGitTidy:
 
         assert files == set()
 
-    @patch.object(GitTidy, "get_commit_files")
     @patch.object(GitTidy, "run_git")
-    def test_get_commits_to_rebase_with_main(self, mock_run_git, mock_get_files):
+    def test_get_commits_to_rebase_with_main(self, mock_run_git):
         """Test getting commits to rebase with main branch."""
         mock_run_git.side_effect = [
             Mock(stdout="feature"),  # branch --show-current (feature branch)
             Mock(stdout="base123"),  # merge-base with main
             Mock(stdout="head456"),  # rev-parse HEAD (different from base)
-            Mock(stdout="abc123|Fix bug 1\ndef456|Fix bug 2"),  # log output
-        ]
-        mock_get_files.side_effect = [
-            {"file1.py", "file2.py"},
-            {"file3.py"},
+            Mock(
+                stdout=log_output(
+                    ("abc123", "Fix bug 1", ["file1.py", "file2.py"]),
+                    ("def456", "Fix bug 2", ["file3.py"]),
+                )
+            ),
         ]
 
         commits = self.git_tidy.get_commits_to_rebase()
@@ -259,10 +394,31 @@ class TestGitTidy:
         assert commits[0]["files"] == {"file1.py", "file2.py"}
         assert commits[1]["sha"] == "def456"
         assert commits[1]["subject"] == "Fix bug 2"
+        assert commits[1]["files"] == {"file3.py"}
+        mock_run_git.assert_called_with(["log", "base123..HEAD", *LOG_ARGS])
 
-    @patch.object(GitTidy, "get_commit_files")
     @patch.object(GitTidy, "run_git")
-    def test_get_commits_to_rebase_fallback_master(self, mock_run_git, mock_get_files):
+    def test_get_commits_to_rebase_single_log_call(self, mock_run_git):
+        """Test that files, empty and merge commits come from one log call."""
+        mock_run_git.return_value = Mock(
+            stdout=log_output(
+                ("abc123", "Add a|b", ["a b.py", "dir/c.py"]),
+                ("def456", "Empty", []),
+                ("ghi789", "Merge branch 'side'", []),
+            )
+        )
+
+        commits = self.git_tidy.get_commits_to_rebase("base")
+
+        assert commits == [
+            {"sha": "abc123", "subject": "Add a|b", "files": {"a b.py", "dir/c.py"}},
+            {"sha": "def456", "subject": "Empty", "files": set()},
+            {"sha": "ghi789", "subject": "Merge branch 'side'", "files": set()},
+        ]
+        mock_run_git.assert_called_once_with(["log", "base..HEAD", *LOG_ARGS])
+
+    @patch.object(GitTidy, "run_git")
+    def test_get_commits_to_rebase_fallback_master(self, mock_run_git):
         """Test getting commits to rebase falling back to master."""
 
         def side_effect(cmd, **kwargs):
@@ -271,19 +427,17 @@ class TestGitTidy:
             elif "master" in cmd:
                 return Mock(stdout="base456")
             else:
-                return Mock(stdout="abc123|Fix bug 1")
+                return Mock(stdout=log_output(("abc123", "Fix bug 1", ["file1.py"])))
 
         mock_run_git.side_effect = side_effect
-        mock_get_files.return_value = {"file1.py"}
 
         commits = self.git_tidy.get_commits_to_rebase()
 
         assert len(commits) == 1
         assert commits[0]["sha"] == "abc123"
 
-    @patch.object(GitTidy, "get_commit_files")
     @patch.object(GitTidy, "run_git")
-    def test_get_commits_to_rebase_fallback_head(self, mock_run_git, mock_get_files):
+    def test_get_commits_to_rebase_fallback_head(self, mock_run_git):
         """Test getting commits to rebase falling back to HEAD~9."""
 
         def side_effect(cmd, **kwargs):
@@ -291,24 +445,21 @@ class TestGitTidy:
                 return Mock(stdout="feature")
             elif "merge-base" in cmd:
                 raise GitError("No branch found")
-            elif cmd == ["rev-list", "--count", "HEAD"]:
+            elif cmd[:2] == ["rev-list", "--count"]:
                 return Mock(stdout="10")  # 10 commits available
             elif "log" in cmd:
-                return Mock(stdout="abc123|Fix bug 1")
+                return Mock(stdout=log_output(("abc123", "Fix bug 1", ["file1.py"])))
             else:
                 raise GitError("Unexpected command")
 
         mock_run_git.side_effect = side_effect
-        mock_get_files.return_value = {"file1.py"}
 
         commits = self.git_tidy.get_commits_to_rebase()
 
         assert len(commits) == 1
         # Should have called with HEAD~9 range (10 commits, so HEAD~9)
         expected_range = "HEAD~9..HEAD"
-        mock_run_git.assert_any_call(
-            ["log", expected_range, "--pretty=format:%H|%s", "--reverse"]
-        )
+        mock_run_git.assert_any_call(["log", expected_range, *LOG_ARGS])
 
     def test_get_commits_to_rebase_empty(self):
         """Test getting commits when no commits found."""
@@ -387,27 +538,43 @@ class TestGitTidy:
         assert len(groups[0]) == 1
         assert groups[0][0]["sha"] == "abc123"
 
-    def test_get_commit_message(self):
+    @patch("git_tidy.core._GitCatFile")
+    def test_get_commit_message(self, mock_cat_file_class):
         """Test getting commit message."""
         mock_output = "Fix bug in authentication\n\nThis commit fixes a critical bug\nin the JWT authentication system.\n\nCloses #123"
+        mock_cat_file = mock_cat_file_class.return_value
+        mock_cat_file.read_commit.return_value = (
+            f"tree t1\nparent p1\nauthor A <a@b> 1 +0000\n\n{mock_output}\n".encode()
+        )
 
-        with patch.object(self.git_tidy, "run_git") as mock_run_git:
-            mock_run_git.return_value = Mock(stdout=mock_output)
-            message = self.git_tidy.get_commit_message("abc123")
+        message = self.git_tidy.get_commit_message("abc123")
 
         assert message == mock_output
-        mock_run_git.assert_called_once_with(
-            ["show", "--pretty=format:%B", "--no-patch", "abc123"]
-        )
+        mock_cat_file.read_commit.assert_called_once_with("abc123")
 
-    def test_get_commit_message_empty(self):
+    @patch("git_tidy.core._GitCatFile")
+    def test_get_commit_message_empty(self, mock_cat_file_class):
         """Test getting commit message from empty commit."""
-        with patch.object(self.git_tidy, "run_git") as mock_run_git:
-            mock_run_git.return_value = Mock(stdout="")
-            message = self.git_tidy.get_commit_message("abc123")
+        mock_cat_file_class.return_value.read_commit.return_value = b"tree t1\n\n"
+
+        message = self.git_tidy.get_commit_message("abc123")
 
         assert message == ""
 
+    @patch("git_tidy.core._GitCatFile")
+    def test_get_commit_message_reuses_reader(self, mock_cat_file_class):
+        """Test that one cat-file worker serves all messages until closed."""
+        mock_cat_file = mock_cat_file_class.return_value
+        mock_cat_file.read_commit.return_value = b"tree t1\n\nMessage\n"
+
+        self.git_tidy.get_commit_message("abc123")
+        self.git_tidy.get_commit_message("def456")
+        self.git_tidy.close_object_reader()
+
+        mock_cat_file_class.assert_called_once_with()
+        mock_cat_file.close.assert_called_once_with()
+        assert self.git_tidy._cat_file is None
+
     @patch("builtins.input")
     @patch.object(GitTidy, "run_git")
     def test_perform_split_rebase_no_splitting_needed(self, mock_run_git, mock_input):
@@ -463,25 +630,22 @@ class TestGitTidy:
         ]
 
         mock_input.return_value = "y"  # User confirms
-        mock_get_message.side_effect = [
-            "Fix bug 1\n\nOriginal message",
-            "Fix bug 2\n\nAnother message",
-        ]
+        raw_log = (
+            "\x01def456\0abc123\0B <b@x> 1700000100 +0000\0"
+            "Fix bug 2\n\nAnother message\n\x02\n"
+            ":100644 100644 1111 3333 M\0file3.py\0\0"
+            "\x01abc123\0base123\0A <a@x> 1700000000 +0000\0"
+            "Fix bug 1\n\nOriginal message\n\x02\n"
+            ":100644 100755 1111 2222 M\0file1.py\0"
+            ":100644 000000 4444 0000 D\0file2.py\0"
+        )
         mock_run_git.side_effect = [
             Mock(stdout="base123"),  # rev-parse for base commit
-            Mock(),  # reset --soft
-            Mock(),  # cherry-pick --no-commit
-            Mock(),  # reset HEAD
-            Mock(),  # add file1.py
-            Mock(),  # commit file1.py
-            Mock(),  # cherry-pick --no-commit
-            Mock(),  # reset HEAD
-            Mock(),  # add file2.py
-            Mock(),  # commit file2.py
-            Mock(),  # cherry-pick --no-commit
-            Mock(),  # reset HEAD
-            Mock(),  # add file3.py
-            Mock(),  # commit file3.py
+            Mock(stdout=raw_log),  # log --raw
+            Mock(stdout="C <c@x> 1700000200 +0000\n"),  # var GIT_COMMITTER_IDENT
+            Mock(),  # fast-import
+            Mock(),  # reset --keep
+            Mock(),  # update-ref -d
         ]
 
         with patch("builtins.print") as mock_print:
@@ -490,15 +654,92 @@ class TestGitTidy:
         assert result is True
         mock_input.assert_called_once_with("\nProceed with split rebase? (y/N): ")
 
-        # Verify git operations were called
-        assert mock_run_git.call_count == 14  # All expected calls
+        # Messages come with the log, the history from a single fast-import
+        mock_get_message.assert_not_called()
+        assert mock_run_git.call_count == 6
         mock_run_git.assert_any_call(["rev-parse", "abc123^"])
-        mock_run_git.assert_any_call(["reset", "--soft", "base123"])
+        mock_run_git.assert_any_call(["reset", "--keep", "refs/git-tidy/split"])
+        fast_import = mock_run_git.call_args_list[3]
+        assert fast_import.args[0] == ["fast-import", "--quiet", "--force"]
+        assert fast_import.kwargs["input"] == (
+            "reset refs/git-tidy/split\nfrom base123\n\n"
+            "commit refs/git-tidy/split\n"
+            "author A <a@x> 1700000000 +0000\n"
+            "committer C <c@x> 1700000200 +0000\n"
+            "data 48\nsplit off file1.py\n\nFix bug 1\n\nOriginal message\n"
+            "M 100755 2222 file1.py\n\n"
+            "commit refs/git-tidy/split\n"
+            "author A <a@x> 1700000000 +0000\n"
+            "committer C <c@x> 1700000200 +0000\n"
+            "data 48\nsplit off file2.py\n\nFix bug 1\n\nOriginal message\n"
+            "D file2.py\n\n"
+            "commit refs/git-tidy/split\n"
+            "author B <b@x> 1700000100 +0000\n"
+            "committer C <c@x> 1700000200 +0000\n"
+            "data 27\nFix bug 2\n\nAnother message\n"
+            "M 100644 3333 file3.py\n\n"
+        )
 
         # Verify print statements
         mock_print.assert_any_call("Splitting 2 commits into 3 file-based commits...")
         mock_print.assert_any_call("Successfully created 3 commits:")
 
+    @patch.object(GitTidy, "run_git")
+    def test_file_changes_rejects_merge_commits(self, mock_run_git):
+        """Test merge commits cannot be rebuilt file by file."""
+        mock_run_git.return_value = Mock(
+            stdout="\x01abc123\0p1 p2\0A <a@x> 1700000000 +0000\0Merge\n\x02\0"
+        )
+
+        with pytest.raises(GitError, match="Cannot split merge commit abc123"):
+            self.git_tidy._file_changes("base..abc123")
+
+    @patch.object(GitTidy, "run_git")
+    def test_file_changes_quotes_awkward_paths(self, mock_run_git):
+        """Test paths fast-import would misread are C-quoted."""
+        mock_run_git.return_value = Mock(
+            stdout="\x01abc123\0p1\0A <a@x> 1700000000 +0000\0Add\n\x02\n"
+            ':000000 100644 0000 1111 A\0"quoted\0'
+            ":100644 000000 2222 0000 D\0two\nlines\0"
+        )
+
+        changes = self.git_tidy._file_changes("base..abc123")
+
+        assert changes["abc123"] == (
+            "A <a@x> 1700000000 +0000",
+            "Add",
+            {'"quoted': 'M 100644 1111 "\\"quoted"', "two\nlines": 'D "two\\nlines"'},
+        )
+
+    def test_perform_split_rebase_removes_scratch_ref_on_failure(
+        self, tmp_path, monkeypatch
+    ):
+        """Test the imported scratch ref is deleted when moving the branch fails."""
+        git = git_repo(tmp_path)
+        (tmp_path / "a").write_text("a\n")
+        git("add", ".")
+        git("commit", "-q", "-m", "base")
+        (tmp_path / "a").write_text("a2\n")
+        (tmp_path / "b").write_text("b\n")
+        git("add", ".")
+        git("commit", "-q", "-m", "two files")
+        monkeypatch.chdir(tmp_path)
+
+        run_git = self.git_tidy.run_git
+
+        def failing_reset(cmd, *args, **kwargs):
+            if cmd[0] == "reset":
+                raise GitError("Git command failed: reset")
+            return run_git(cmd, *args, **kwargs)
+
+        commits = self.git_tidy.get_commits_to_rebase("HEAD~1")
+        with patch.object(self.git_tidy, "run_git", side_effect=failing_reset):
+            with patch("builtins.print"), pytest.raises(GitError):
+                self.git_tidy.perform_split_rebase(commits, no_prompt=True)
+        self.git_tidy.close_object_reader()
+
+        assert git("show-ref", "refs/git-tidy/split").returncode == 1
+
     @patch("builtins.input")
     @patch.object(GitTidy, "run_git")
     @patch.object(GitTidy, "get_commit_message")
@@ -549,7 +790,7 @@ class TestGitTidy:
     def test_rebase_skip_merged_exec_success(self, mock_run_git):
         """Test successful execution of rebase_skip_merged."""
         # current branch, fetch, cherry list, rev-parse HEAD, branch backup,
-        # switch temp, cherry-pick for each sha, branch -f, switch back, branch -D
+        # switch temp, one cherry-pick for the range, switch -C back, branch -D
         mock_run_git.side_effect = [
             Mock(stdout="feature/B"),  # current branch
             Mock(),  # fetch
@@ -557,10 +798,8 @@ class TestGitTidy:
             Mock(stdout="deadbeefdeadbeef"),  # rev-parse HEAD
             Mock(),  # branch backup
             Mock(),  # switch -c temp from base
-            Mock(returncode=0),  # cherry-pick abc123
-            Mock(returncode=0),  # cherry-pick ghi789
-            Mock(),  # branch -f
-            Mock(),  # switch branch
+            Mock(returncode=0),  # cherry-pick abc123 ghi789
+            Mock(),  # switch -C branch
             Mock(),  # branch -D temp
         ]
 
@@ -577,6 +816,36 @@ class TestGitTidy:
             )
 
         mock_print.assert_any_call("Rebase-skip-merged completed successfully.")
+        mock_run_git.assert_any_call(
+            ["cherry-pick", "-X", "find-renames", "abc123", "ghi789"],
+            check_output=False,
+        )
+        mock_run_git.assert_any_call(["switch", "-C", "feature/B"])
+
+    @patch.object(GitTidy, "run_git")
+    def test_rebase_skip_merged_range_conflict_names_commit(self, mock_run_git):
+        """Test a conflict in a batched replay reports the commit that failed."""
+        mock_run_git.side_effect = [
+            Mock(stdout="feature/B"),  # current branch
+            Mock(),  # fetch
+            Mock(stdout="+ abc123 A\n+ ghi789 B"),  # cherry
+            Mock(),  # switch -c temp from base
+            Mock(returncode=1, stderr="conflict"),  # cherry-pick abc123 ghi789
+            Mock(stdout="ghi789\n"),  # rev-parse CHERRY_PICK_HEAD
+            Mock(),  # cherry-pick --abort
+            Mock(),  # switch back
+            Mock(),  # branch -D temp
+        ]
+
+        with patch("builtins.print") as mock_print:
+            self.git_tidy.rebase_skip_merged(
+                {"base": "origin/main", "prompt": False, "backup": False}
+            )
+
+        mock_print.assert_any_call("Cherry-pick failed for ghi789: conflict")
+        mock_run_git.assert_any_call(
+            ["cherry-pick", "--abort"], check_output=False, capture=False
+        )
 
     @patch.object(GitTidy, "run_git")
     def test_rebase_skip_merged_optimize_merge_and_bias(self, mock_run_git):
@@ -589,8 +858,7 @@ class TestGitTidy:
             Mock(),  # branch backup
             Mock(),  # switch -c temp
             Mock(returncode=0),  # cherry-pick with -X theirs
-            Mock(),  # branch -f
-            Mock(),  # switch branch
+            Mock(),  # switch -C branch
             Mock(),  # branch -D temp
         ]
 
@@ -672,7 +940,7 @@ class TestGitTidy:
 
         # Now run with import/export through the path where there are no commits
         mock_run_git.side_effect = [
-            Mock(stdout="feature/B"),  # current
+            # current branch is reused from the first call on this instance
             Mock(),  # fetch
             Mock(stdout=""),  # cherry -> no unique
         ]
@@ -688,6 +956,35 @@ class TestGitTidy:
                 }
             )
 
+    @patch.object(GitTidy, "run_git")
+    def test_rebase_skip_merged_reports_skipped_rerere_files(
+        self, mock_run_git, tmp_path, monkeypatch
+    ):
+        """Test rerere cache files that cannot be imported are counted."""
+        monkeypatch.chdir(tmp_path)
+        shared = tmp_path / "shared"
+        (shared / "abc").mkdir(parents=True)
+        (shared / "abc" / "postimage").write_text("resolved")
+        (shared / "abc" / "preimage").symlink_to(tmp_path / "missing")
+        # fetch, cherry with one unique commit, then switch/cherry-pick succeed
+        mock_run_git.return_value = Mock(returncode=0, stdout="+ abc123 Commit A\n")
+
+        with patch("builtins.print") as mock_print:
+            self.git_tidy.rebase_skip_merged(
+                {
+                    "base": "origin/main",
+                    "branch": "feature/B",
+                    "prompt": False,
+                    "backup": False,
+                    "use_rerere_cache": True,
+                    "rerere_cache": str(shared),
+                }
+            )
+
+        mock_print.assert_any_call("Imported rerere cache")
+        mock_print.assert_any_call("Skipped 1 files that could not be copied")
+        mock_print.assert_any_call("Exported rerere cache")
+
     @patch.object(GitTidy, "run_git")
     def test_configure_repo_dry_run(self, mock_run_git):
         """Test configure_repo dry-run prints planned changes."""
@@ -713,6 +1010,24 @@ class TestGitTidy:
         calls = [args[0][0] for args in mock_run_git.call_args_list]
         assert any(call[:2] == ["config", "--local"] for call in calls)
 
+    @patch.object(GitTidy, "run_git")
+    def test_configure_repo_skips_settings_already_set(self, mock_run_git):
+        """Test configure_repo only writes settings whose value differs."""
+        mock_run_git.return_value = Mock(
+            returncode=0,
+            stdout="rerere.enabled=true\nrerere.autoupdate=false\n"
+            "merge.conflictstyle=zdiff3\n",
+        )
+
+        self.git_tidy.configure_repo({"scope": "local", "dry_run": False})
+
+        calls = [args[0][0] for args in mock_run_git.call_args_list]
+        assert calls[0] == ["config", "--local", "--list"]
+        assert ["config", "--local", "rerere.autoUpdate", "true"] in calls
+        assert ["config", "--local", "rerere.enabled", "true"] not in calls
+        assert ["config", "--local", "merge.conflictStyle", "zdiff3"] not in calls
+        assert len(calls) == 1 + 12 - 2
+
     @patch.object(GitTidy, "perform_split_rebase")
     @patch.object(GitTidy, "get_commits_to_rebase")
     @patch.object(GitTidy, "create_backup")
@@ -808,8 +1123,9 @@ class TestGitTidy:
             )
         mock_print.assert_any_call("Preflight OK. Behind/ahead (base...branch): 1\t2")
 
+    @patch("git_tidy.core._GitCatFile")
     @patch.object(GitTidy, "run_git")
-    def test_select_base_prefers_first_available(self, mock_run_git):
+    def test_select_base_prefers_first_available(self, mock_run_git, _mock_cat_file):
         # merge-base for first preferred succeeds
         mock_run_git.return_value = Mock(stdout="base123")
         base = self.git_tidy.select_base(
@@ -817,39 +1133,248 @@ class TestGitTidy:
         )
         assert base == "origin/main"
 
+    @patch("git_tidy.core._GitCatFile")
     @patch.object(GitTidy, "run_git")
-    def test_auto_continue_nothing(self, mock_run_git):
+    def test_select_base_skips_missing_candidates(
+        self, mock_run_git, mock_cat_file_class
+    ):
+        """Test missing candidates are skipped without running merge-base."""
+
+        def read_commit(rev):
+            if rev != "master":
+                raise GitError(f"Git object not found: {rev}")
+            return b"tree t1\n\nBase\n"
+
+        mock_cat_file_class.return_value.read_commit.side_effect = read_commit
+        mock_run_git.return_value = Mock(stdout="base123")
+
+        base = self.git_tidy.select_base(
+            {"preferred": ["origin/main", "main", "master"], "fallback": "HEAD~5"}
+        )
+        assert base == "master"
+        mock_run_git.assert_called_once_with(["merge-base", "HEAD", "master"])
+
+        # Nothing resolves: fall back without any git process
+        mock_run_git.reset_mock()
+        base = self.git_tidy.select_base({"preferred": ["nope"], "fallback": "HEAD~5"})
+        assert base == "HEAD~5"
+        mock_run_git.assert_not_called()
+        mock_cat_file_class.assert_called_once_with()
+
+    @patch("subprocess.run")
+    def test_merge_base_caches_failures(self, mock_run):
+        """Test merge-base answers, including misses, are probed only once."""
+        mock_run.side_effect = [
+            subprocess.CalledProcessError(128, "git", stderr="Not a valid object"),
+            Mock(stdout="base123\n", returncode=0),
+        ]
+
+        assert self.git_tidy._merge_base("HEAD", "main") is None
+        assert self.git_tidy._merge_base("HEAD", "master") == "base123"
+        assert self.git_tidy._merge_base("HEAD", "main") is None
+        assert self.git_tidy._merge_base("HEAD", "master") == "base123"
+        assert mock_run.call_count == 2
+
+    @patch("git_tidy.core._GitCatFile")
+    @patch("subprocess.run")
+    def test_select_base_cached_until_refs_change(self, mock_run, _mock_cat_file):
+        """Test the selected base is reused until a command moves refs."""
+        mock_run.return_value = Mock(stdout="base123", returncode=0)
+
+        assert self.git_tidy.select_base({}) == "origin/main"
+        assert self.git_tidy.select_base({}) == "origin/main"
+        assert mock_run.call_count == 1
+
+        self.git_tidy.run_git(["fetch", "origin"])
+        self.git_tidy.select_base({})
+        assert mock_run.call_count == 3
+
+        self.git_tidy.run_git(["reset", "--hard", "HEAD~1"])
+        self.git_tidy.select_base({})
+        assert mock_run.call_count == 5
+
+    @patch.object(GitTidy, "_resolve_git_paths")
+    @patch.object(GitTidy, "_git_path", side_effect=lambda name: f".git/{name}")
+    @patch.object(GitTidy, "run_git")
+    def test_auto_continue_nothing(self, mock_run_git, _mock_path, _mock_resolve):
         mock_run_git.side_effect = [Mock(returncode=1), Mock(returncode=1)]
         with patch("builtins.print") as mock_print:
             self.git_tidy.auto_continue()
         mock_print.assert_any_call("Nothing to continue")
 
+    @patch.object(GitTidy, "_resolve_git_paths")
+    @patch.object(GitTidy, "_git_path", side_effect=lambda name: f".git/{name}")
+    @patch.object(GitTidy, "run_git")
+    def test_auto_resolve_trivial_continues_active_operation(
+        self, mock_run_git, _mock_path, _mock_resolve, tmp_path, monkeypatch
+    ):
+        """Test only the operation git left state for is continued."""
+        monkeypatch.chdir(tmp_path)
+        with patch("builtins.print") as mock_print:
+            self.git_tidy.auto_resolve_trivial()
+        mock_run_git.assert_not_called()
+        mock_print.assert_any_call("Trivial auto-resolution not applicable")
+
+        (tmp_path / ".git" / "rebase-merge").mkdir(parents=True)
+        mock_run_git.side_effect = [
+            Mock(returncode=0, stdout=""),  # diff --diff-filter=U
+            Mock(returncode=0),  # rebase --continue
+        ]
+        with patch("builtins.print") as mock_print:
+            self.git_tidy.auto_resolve_trivial()
+        mock_run_git.assert_called_with(["rebase", "--continue"], check_output=False)
+        mock_print.assert_any_call("Continued after trivial resolution (rebase)")
+
+        # Unmerged paths are left for the user instead of a doomed continue
+        mock_run_git.reset_mock(side_effect=True)
+        mock_run_git.return_value = Mock(returncode=0, stdout="a.py\n")
+        with patch("builtins.print"):
+            self.git_tidy.auto_resolve_trivial()
+        mock_run_git.assert_called_once()
+
+    def test_auto_continue_from_subdirectory(self, tmp_path, monkeypatch):
+        """Test a resolved cherry-pick is continued from below the top level."""
+        git = git_repo(tmp_path)
+        (tmp_path / "sub").mkdir()
+        (tmp_path / "sub" / "file.txt").write_text("base\n")
+        git("add", ".")
+        git("commit", "-q", "-m", "base")
+        git("switch", "-q", "-c", "other")
+        (tmp_path / "sub" / "file.txt").write_text("other\n")
+        git("commit", "-q", "-am", "other")
+        git("switch", "-q", "-")
+        (tmp_path / "sub" / "file.txt").write_text("main\n")
+        git("commit", "-q", "-am", "main")
+        git("cherry-pick", "other")
+        assert (tmp_path / ".git" / "CHERRY_PICK_HEAD").exists()
+        (tmp_path / "sub" / "file.txt").write_text("resolved\n")
+        git("add", ".")
+
+        monkeypatch.chdir(tmp_path / "sub")
+        monkeypatch.setenv("GIT_EDITOR", "true")
+        with patch("builtins.print") as mock_print:
+            self.git_tidy.auto_continue()
+
+        mock_print.assert_any_call("Continued cherry-pick")
+        assert not (tmp_path / ".git" / "CHERRY_PICK_HEAD").exists()
+
+    def test_auto_continue_stopped_revert_sequence(self, tmp_path, monkeypatch):
+        """Test a stopped multi-commit revert is continued with revert."""
+        git = git_repo(tmp_path)
+        for name, content in (
+            ("f", "1"),
+            ("g", "1"),
+            ("f", "2"),
+            ("f", "3"),
+            ("g", "2"),
+        ):
+            (tmp_path / name).write_text(f"{content}\n")
+            git("add", ".")
+            git("commit", "-q", "-m", f"{name}={content}")
+        # Reverting f=2 conflicts with f=3; reverting g=2 would apply cleanly
+        git("revert", "--no-edit", "HEAD~2", "HEAD")
+        (tmp_path / "f").write_text("resolved\n")
+        git("add", "f")
+        monkeypatch.chdir(tmp_path)
+        monkeypatch.setenv("GIT_EDITOR", "true")
+
+        assert self.git_tidy._operation_in_progress() == "revert"
+        # Committing by hand drops REVERT_HEAD but leaves the sequence running
+        git("commit", "-q", "--no-edit")
+        assert not (tmp_path / ".git" / "REVERT_HEAD").exists()
+        assert self.git_tidy._operation_in_progress() == "revert"
+
+        with patch("builtins.print") as mock_print:
+            self.git_tidy.auto_continue()
+
+        mock_print.assert_any_call("Continued revert")
+        assert not (tmp_path / ".git" / "sequencer").exists()
+        assert (tmp_path / "g").read_text() == "1\n"
+
     @patch.object(GitTidy, "run_git")
     def test_chunked_replay_missing_args(self, mock_run_git):
         with patch("builtins.print") as mock_print:
             self.git_tidy.chunked_replay({"base": None, "commits": [], "chunk_size": 0})
         mock_print.assert_any_call("Missing required arguments for chunked-replay")
 
+    def test_split_commits_flattens_values(self):
+        """Test comma-separated and repeated commit values flatten in order."""
+        assert _split_commits(["a1,b2", "c3"]) == ["a1", "b2", "c3"]
+        assert _split_commits(["a1", "b2"]) == ["a1", "b2"]
+        assert _split_commits(["a1,,b2,", "", ","]) == ["a1", "b2"]
+        assert _split_commits([]) == []
+        assert _split_commits(None) == []
+
     @patch.object(GitTidy, "run_git")
-    def test_range_diff_report(self, mock_run_git):
-        mock_run_git.return_value = Mock(returncode=0, stdout="diff ok")
+    def test_chunked_replay_splits_commits(self, mock_run_git):
+        mock_run_git.side_effect = [
+            Mock(stdout="abc123\n"),  # rev-parse --short HEAD
+            Mock(),  # switch -c temp base
+            Mock(returncode=0),  # cherry-pick a1 b2
+            Mock(returncode=0),  # cherry-pick c3
+        ]
+        with patch("builtins.print"):
+            self.git_tidy.chunked_replay(
+                {"base": "main", "commits": ["a1,b2", "c3,"], "chunk_size": 2}
+            )
+        mock_run_git.assert_any_call(["cherry-pick", "a1", "b2"], check_output=False)
+        mock_run_git.assert_any_call(["cherry-pick", "c3"], check_output=False)
+
+    @patch("subprocess.Popen")
+    def test_range_diff_report(self, mock_popen):
+        mock_popen.return_value.stdout = io.StringIO("1: a = 1: a\ndiff ok\n")
         with patch("builtins.print") as mock_print:
             self.git_tidy.range_diff_report("A", "B")
-        mock_print.assert_any_call("diff ok")
+        mock_print.assert_any_call("diff ok\n", end="")
+        assert mock_popen.call_args.args[0][1:] == ["range-diff", "A", "B"]
+        mock_popen.return_value.wait.assert_called_once_with()
 
     def test_rerere_share_missing(self):
         with patch("builtins.print") as mock_print:
             self.git_tidy.rerere_share({})
         mock_print.assert_any_call("Missing action or path")
 
+    def test_rerere_share_import_export(self, tmp_path, monkeypatch):
+        """Test rerere cache import/export merges trees and skips unchanged files."""
+        monkeypatch.chdir(tmp_path)
+        shared = tmp_path / "shared"
+        (shared / "abc").mkdir(parents=True)
+        (shared / "abc" / "postimage").write_text("resolved")
+        (tmp_path / ".git" / "rr-cache" / "def").mkdir(parents=True)
+        (tmp_path / ".git" / "rr-cache" / "def" / "preimage").write_text("local")
+
+        with patch("builtins.print"):
+            self.git_tidy.rerere_share({"action": "import", "path": str(shared)})
+            with patch("shutil.copy2", wraps=shutil.copy2) as mock_copy:
+                self.git_tidy.rerere_share({"action": "export", "path": str(shared)})
+
+        local = tmp_path / ".git" / "rr-cache"
+        assert (local / "abc" / "postimage").read_text() == "resolved"
+        assert (shared / "def" / "preimage").read_text() == "local"
+        # The imported entry is already up to date in the shared cache
+        assert [c.args[0] for c in mock_copy.call_args_list] == [
+            os.path.join(".git", "rr-cache", "def", "preimage")
+        ]
+
+    def test_rerere_share_reports_skipped_files(self, tmp_path, monkeypatch):
+        """Test files that cannot be copied are counted instead of aborting."""
+        monkeypatch.chdir(tmp_path)
+        shared = tmp_path / "shared"
+        (shared / "abc").mkdir(parents=True)
+        (shared / "abc" / "postimage").write_text("resolved")
+        (shared / "abc" / "preimage").symlink_to(tmp_path / "missing")
+
+        with patch("builtins.print") as mock_print:
+            self.git_tidy.rerere_share({"action": "import", "path": str(shared)})
+
+        local = tmp_path / ".git" / "rr-cache"
+        assert (local / "abc" / "postimage").read_text() == "resolved"
+        mock_print.assert_any_call("Skipped 1 files that could not be copied")
+
     @patch.object(GitTidy, "run_git")
     def test_smart_merge_preview_clean(self, mock_run_git):
-        # switch target, merge --no-commit success, merge --abort
-        mock_run_git.side_effect = [
-            Mock(),  # switch target
-            Mock(returncode=0),  # merge --no-commit clean
-            Mock(),  # merge --abort
-        ]
+        # switch target, merge-tree clean; nothing to abort
+        mock_run_git.return_value = Mock(returncode=0)
         with patch("builtins.print") as mock_print:
             self.git_tidy.smart_merge(
                 {
@@ -863,6 +1388,68 @@ class TestGitTidy:
                 }
             )
         mock_print.assert_any_call("Merge would be clean")
+        assert mock_run_git.call_count == 2
+        mock_run_git.assert_called_with(
+            [
+                "merge-tree",
+                "--write-tree",
+                "--name-only",
+                "--messages",
+                "main",
+                "feature/X",
+            ],
+            check_output=False,
+        )
+
+    @patch.object(GitTidy, "run_git")
+    def test_smart_merge_preview_conflicts(self, mock_run_git):
+        """Test preview reports merge-tree conflict messages."""
+        mock_run_git.return_value = Mock(
+            returncode=1,
+            stdout="tree123\nh\n\nCONFLICT (content): Merge conflict in h\n",
+        )
+        with patch("builtins.print") as mock_print:
+            self.git_tidy.smart_merge({"branch": "feature/X", "into": "main"})
+        mock_print.assert_any_call(
+            "Merge resulted in conflicts: CONFLICT (content): Merge conflict in h"
+        )
+
+    @patch.object(GitTidy, "run_git")
+    def test_smart_merge_preview_falls_back_when_merge_tree_fails(self, mock_run_git):
+        """Test a merge-tree usage error is not reported as conflicts."""
+        mock_run_git.side_effect = [
+            Mock(),  # switch target
+            Mock(returncode=129, stdout="", stderr="usage: git merge-tree"),
+            Mock(returncode=0),  # merge --no-commit clean
+            Mock(),  # merge --abort
+        ]
+        with patch("builtins.print") as mock_print:
+            self.git_tidy.smart_merge({"branch": "feature/X", "into": "main"})
+        mock_print.assert_any_call("Merge would be clean")
+        mock_run_git.assert_any_call(
+            ["merge", "-X", "find-renames", "--no-commit", "--no-ff", "feature/X"],
+            check_output=False,
+        )
+        mock_run_git.assert_called_with(
+            ["merge", "--abort"], check_output=False, capture=False
+        )
+
+    @patch.object(GitTidy, "run_git")
+    def test_smart_merge_preview_with_bias_uses_merge(self, mock_run_git):
+        """Test previews needing -X options still go through merge and abort."""
+        mock_run_git.side_effect = [
+            Mock(),  # switch target
+            Mock(returncode=0),  # merge --no-commit clean
+            Mock(),  # merge --abort
+        ]
+        with patch("builtins.print") as mock_print:
+            self.git_tidy.smart_merge(
+                {"branch": "feature/X", "into": "main", "conflict_bias": "ours"}
+            )
+        mock_print.assert_any_call("Merge would be clean")
+        mock_run_git.assert_called_with(
+            ["merge", "--abort"], check_output=False, capture=False
+        )
 
     @patch.object(GitTidy, "run_git")
     @patch.object(GitTidy, "create_backup")
@@ -890,12 +1477,10 @@ class TestGitTidy:
 
     @patch.object(GitTidy, "run_git")
     def test_smart_revert_preview_clean(self, mock_run_git):
-        # select commits, revert --no-commit clean, revert --abort
+        # select commits, revert --no-commit clean
         mock_run_git.side_effect = [
             Mock(stdout="a1\na2"),  # log -> selected SHAs
-            Mock(returncode=0),  # revert a1 --no-commit
-            Mock(returncode=0),  # revert a2 --no-commit
-            Mock(),  # revert --abort
+            Mock(returncode=0),  # revert --no-commit a1 a2
         ]
         with patch("builtins.print") as mock_print:
             self.git_tidy.smart_revert(
@@ -918,8 +1503,7 @@ class TestGitTidy:
     def test_smart_revert_apply_commits(self, mock_cleanup, mock_backup, mock_run_git):
         # direct commits provided, revert clean then commit
         mock_run_git.side_effect = [
-            Mock(returncode=0),  # revert a1
-            Mock(returncode=0),  # revert a2
+            Mock(returncode=0),  # revert a1 a2
             Mock(returncode=0),  # commit --no-edit
         ]
         with patch("builtins.print"):
@@ -935,6 +1519,25 @@ class TestGitTidy:
             )
         mock_backup.assert_called_once()
         mock_cleanup.assert_called_once()
+        assert mock_run_git.call_args_list[0].args[0][-2:] == ["a1", "a2"]
+
+    @patch.object(GitTidy, "run_git")
+    def test_smart_revert_preview_conflict_names_commit(self, mock_run_git):
+        """Test a conflict in a batched revert reports the commit that failed."""
+        mock_run_git.side_effect = [
+            Mock(returncode=1, stderr="conflict"),  # revert --no-commit a1 a2
+            Mock(stdout="a2\n"),  # rev-parse REVERT_HEAD
+            Mock(),  # revert --abort
+        ]
+        with patch("builtins.print") as mock_print:
+            self.git_tidy.smart_revert(
+                {"commits": ["a1", "a2"], "apply": False, "rename_detect": False}
+            )
+        mock_print.assert_any_call("Revert failed for a2: conflict")
+        mock_print.assert_any_call("Revert preview ended with conflicts surfaced.")
+        mock_run_git.assert_called_with(
+            ["revert", "--abort"], check_output=False, capture=False
+        )
 
     @patch.object(GitTidy, "run_git")
     @patch.object(GitTidy, "select_base")
@@ -967,6 +1570,28 @@ class TestGitTidy:
         mock_cleanup.assert_not_called()
         mock_backup.assert_not_called()
 
+    @patch.object(GitTidy, "run_git")
+    @patch.object(GitTidy, "preflight_check")
+    @patch.object(GitTidy, "rebase_skip_merged")
+    @patch.object(GitTidy, "range_diff_report")
+    def test_smart_rebase_summary_compares_old_and_new_tip(
+        self, mock_report, _mock_rsm, _mock_preflight, mock_run_git
+    ):
+        """Test the summary diffs the pre-rebase series against the new one."""
+        options = {"branch": "feature/B", "base": "main", "backup": False}
+        mock_run_git.side_effect = [Mock(stdout="old1\n"), Mock(stdout="new1\n")]
+        with patch("builtins.print"):
+            self.git_tidy.smart_rebase(options)
+        mock_report.assert_called_once_with("main..old1", "main..new1")
+
+        # Nothing moved, so there is nothing to range-diff
+        mock_report.reset_mock()
+        mock_run_git.side_effect = [Mock(stdout="old1\n"), Mock(stdout="old1\n")]
+        with patch("builtins.print") as mock_print:
+            self.git_tidy.smart_rebase(options)
+        mock_report.assert_not_called()
+        mock_print.assert_any_call("Branch unchanged; nothing to compare")
+
     @patch.object(GitTidy, "run_git")
     @patch.object(GitTidy, "select_base")
     @patch.object(GitTidy, "preflight_check")
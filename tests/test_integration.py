@@ -47,6 +47,65 @@ class TestGitTidyIntegration:
         assert result is True
         mock_unlink.assert_called_once_with("/tmp/test_todo")
 
+    @patch.object(GitTidy, "run_git")
+    @patch("tempfile.NamedTemporaryFile")
+    @patch("os.unlink")
+    def test_perform_rebase_writes_todo(
+        self, mock_unlink, mock_temp_file, mock_run_git
+    ):
+        """Test the todo is streamed to the file with each group described once."""
+        mock_file = Mock()
+        mock_file.name = "/tmp/test_todo"
+        mock_file.writelines.side_effect = lambda lines: written.extend(lines)
+        mock_temp_file.return_value.__enter__.return_value = mock_file
+        mock_run_git.side_effect = [
+            Mock(stdout="base123"),  # rev-parse for base commit
+            Mock(returncode=0),  # rebase command success
+        ]
+        written: list[str] = []
+        groups = [
+            [{"sha": "abc123", "subject": "Fix bug 1", "files": {"file1.py"}}],
+            [{"sha": "def456", "subject": "Fix bug 2", "files": {"file2.py"}}],
+        ]
+
+        with patch.object(
+            self.git_tidy, "describe_group", side_effect=["Files: a", "Files: b"]
+        ) as mock_describe:
+            with patch("builtins.print"):
+                self.git_tidy.perform_rebase(groups, no_prompt=True)
+
+        assert mock_describe.call_count == 2
+        assert written == [
+            "pick abc123 Fix bug 1\n",
+            "# Group 2: Files: b\n",
+            "pick def456 Fix bug 2\n",
+        ]
+
+    @patch.object(GitTidy, "run_git")
+    @patch("tempfile.NamedTemporaryFile")
+    @patch("os.unlink")
+    def test_perform_rebase_quotes_todo_path(
+        self, mock_unlink, mock_temp_file, mock_run_git
+    ):
+        """Test the sequence editor survives a temp dir containing spaces."""
+        mock_file = Mock()
+        mock_file.name = "/tmp/my dir/test_todo"
+        mock_temp_file.return_value.__enter__.return_value = mock_file
+        mock_run_git.side_effect = [
+            Mock(stdout="base123"),  # rev-parse for base commit
+            Mock(returncode=0),  # rebase command success
+        ]
+        groups = [
+            [{"sha": "abc123", "subject": "Fix bug 1", "files": {"file1.py"}}],
+            [{"sha": "def456", "subject": "Fix bug 2", "files": {"file2.py"}}],
+        ]
+
+        with patch("builtins.print"):
+            self.git_tidy.perform_rebase(groups, no_prompt=True)
+
+        env = mock_run_git.call_args.kwargs["env"]
+        assert env["GIT_SEQUENCE_EDITOR"] == "cp '/tmp/my dir/test_todo'"
+
     @patch.object(GitTidy, "run_git")
     @patch("tempfile.NamedTemporaryFile")
     @patch("os.unlink")
@@ -136,8 +195,10 @@ class TestGitTidyIntegration:
         """Test successful run workflow."""
         mock_commits = [
             {"sha": "abc123", "subject": "Fix bug 1", "files": {"file1.py"}},
+            {"sha": "def456", "subject": "Fix bug 2", "files": {"file2.py"}},
+            {"sha": "ghi789", "subject": "Fix bug 3", "files": {"file1.py"}},
         ]
-        mock_groups = [mock_commits]
+        mock_groups = [[mock_commits[0], mock_commits[2]], [mock_commits[1]]]
 
         mock_get_commits.return_value = mock_commits
         mock_group.return_value = mock_groups
@@ -152,6 +213,29 @@ class TestGitTidyIntegration:
         mock_rebase.assert_called_once_with(mock_groups, no_prompt=False)
         mock_cleanup.assert_called_once()
 
+    @patch.object(GitTidy, "create_backup")
+    @patch.object(GitTidy, "get_commits_to_rebase")
+    @patch.object(GitTidy, "perform_rebase")
+    @patch.object(GitTidy, "cleanup_backup")
+    def test_run_already_ordered(
+        self, mock_cleanup, mock_rebase, mock_get_commits, mock_backup
+    ):
+        """Test run skips the rebase when grouping keeps the commit order."""
+        mock_get_commits.return_value = [
+            {"sha": "abc123", "subject": "Fix bug 1", "files": {"file1.py"}},
+            {"sha": "def456", "subject": "Fix bug 2", "files": {"file1.py"}},
+            {"sha": "ghi789", "subject": "Fix bug 3", "files": {"file2.py"}},
+        ]
+
+        with patch("builtins.print") as mock_print:
+            self.git_tidy.run(similarity_threshold=0.5)
+
+        mock_rebase.assert_not_called()
+        mock_cleanup.assert_called_once()
+        mock_print.assert_called_with(
+            "No grouping needed - commits are already optimally ordered"
+        )
+
     @patch.object(GitTidy, "create_backup")
     @patch.object(GitTidy, "get_commits_to_rebase")
     @patch.object(GitTidy, "restore_from_backup")
@@ -178,8 +262,10 @@ class TestGitTidyIntegration:
         """Test run workflow when rebase fails."""
         mock_commits = [
             {"sha": "abc123", "subject": "Fix bug 1", "files": {"file1.py"}},
+            {"sha": "def456", "subject": "Fix bug 2", "files": {"file2.py"}},
+            {"sha": "ghi789", "subject": "Fix bug 3", "files": {"file1.py"}},
         ]
-        mock_groups = [mock_commits]
+        mock_groups = [[mock_commits[0], mock_commits[2]], [mock_commits[1]]]
 
         mock_get_commits.return_value = mock_commits
         mock_group.return_value = mock_groups
@@ -261,17 +347,50 @@ class TestGitTidyErrorHandling:
     @patch.object(GitTidy, "run_git")
     def test_get_commits_to_rebase_with_custom_base(self, mock_run_git):
         """Test get_commits_to_rebase with custom base reference."""
-        mock_run_git.return_value = Mock(stdout="abc123|Fix bug 1")
+        mock_run_git.return_value = Mock(
+            stdout="\x01abc123\x00base1\x00Fix bug 1\nfile1.py\x00\x00"
+        )
 
-        with patch.object(self.git_tidy, "get_commit_files") as mock_get_files:
-            mock_get_files.return_value = {"file1.py"}
-            self.git_tidy.get_commits_to_rebase("custom-base")
+        commits = self.git_tidy.get_commits_to_rebase("custom-base")
 
+        assert commits[0]["files"] == {"file1.py"}
         expected_range = "custom-base..HEAD"
         mock_run_git.assert_called_once_with(
-            ["log", expected_range, "--pretty=format:%H|%s", "--reverse"]
+            [
+                "log",
+                expected_range,
+                "-z",
+                "--name-only",
+                "--pretty=format:%x01%H%x00%P%x00%s",
+                "--reverse",
+            ]
         )
 
+    @patch.object(GitTidy, "run_git")
+    @patch("tempfile.NamedTemporaryFile")
+    @patch("os.unlink")
+    def test_perform_rebase_uses_listed_parent(
+        self, mock_unlink, mock_temp_file, mock_run_git
+    ):
+        """Test the rebase base comes from the log instead of rev-parse."""
+        mock_file = Mock()
+        mock_file.name = "/tmp/test_todo"
+        mock_temp_file.return_value.__enter__.return_value = mock_file
+        mock_run_git.side_effect = [
+            Mock(
+                stdout="\x01abc123\x00base1 side1\x00Merge\x00"
+                "\x01def456\x00abc123\x00Fix bug 1\nfile1.py\x00\x00"
+            ),
+            Mock(returncode=0),  # rebase
+        ]
+
+        commits = self.git_tidy.get_commits_to_rebase("custom-base")
+        with patch("builtins.print"):
+            self.git_tidy.perform_rebase([[c] for c in commits], no_prompt=True)
+
+        assert mock_run_git.call_count == 2
+        assert mock_run_git.call_args.args[0] == ["rebase", "-i", "base1"]
+
     def test_calculate_similarity_edge_cases(self):
         """Test calculate_similarity with edge cases."""
         # Both empty sets